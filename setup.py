@@ -45,6 +45,9 @@ setup(
         "dataclasses>=0.6",
     ],
     extras_require={
+        "fast": [
+            "orjson>=3.6",
+        ],
         "dev": [
             "pytest>=7.0",
             "pytest-asyncio>=0.21",
@@ -143,6 +143,7 @@ class AgentManager:
         self.config = config
         self.num_agents = max(2, num_agents)  # Minimum 2 agents
         self.agents: List[Agent] = []
+        self._agents_by_id: Dict[int, Agent] = {}  # Index over self.agents
         self.interfaces: Dict[int, ClaudeInterface] = {}
         self._monitoring_task: Optional[asyncio.Task] = None
         self._shutdown = False
@@ -179,6 +180,7 @@ class AgentManager:
         for i in range(self.num_agents):
             agent = await self._create_agent(i, session_id)
             self.agents.append(agent)
+            self._agents_by_id[agent.id] = agent
             
             # Stagger agent launches
             if i < self.num_agents - 1:
@@ -253,10 +255,7 @@ class AgentManager:
     
     def get_agent_by_id(self, agent_id: int) -> Optional[Agent]:
         """Get specific agent by ID"""
-        for agent in self.agents:
-            if agent.id == agent_id:
-                return agent
-        return None
+        return self._agents_by_id.get(agent_id)
     
     def get_available_agent(self) -> Optional[Agent]:
         """Get next available agent using round-robin"""
@@ -1158,6 +1157,7 @@ class AgentManager:
             
             # Add to agents list
             self.agents.append(agent)
+            self._agents_by_id[agent.id] = agent
             
             # Stop monitoring regular agents now that finalization is starting
             self.stop_regular_monitoring = True
@@ -216,8 +216,7 @@ def status(ctx, session, detailed):
             return
         
         click.echo("Active Sessions:")
-        for sess in active_sessions:
-            session_manager.display_session_summary(sess)
+        session_manager.display_session_summaries(active_sessions)
 
 
 @cli.command()
@@ -322,8 +321,7 @@ def list(ctx, all, limit):
         click.echo("No sessions found")
         return
     
-    for session in sessions:
-        session_manager.display_session_summary(session)
+    session_manager.display_session_summaries(sessions)
 
 
 @cli.command()
@@ -65,7 +65,11 @@ class Config:
             'agent_monitor_interval': 30,  # Check agents every 30 seconds
             'message_grace_period': 60,  # Wait 60 seconds after sending message
             'wait_check_interval': 5,  # Check interval when waiting for agents
-            
+            'project_monitor_min_interval': 5,  # Fastest project progress check (backs off to 30s)
+            'project_task_budget_seconds': 600,  # Execution timeout per task of the busiest agent (min 1h)
+            'event_flush_interval': 0.05,  # Flush buffered session events every 50ms
+            'event_flush_max_events': 64,  # ...or as soon as this many are pending
+
             # Enhanced completion detection settings
             'completion_verification_enabled': True,  # Enable proactive completion verification
             'completion_verification_interval': 300,  # Send verification every 5 minutes
@@ -102,6 +106,8 @@ class Config:
             'project_quality_threshold': 3,       # Minimum files per project for completion consideration
             'require_completion_confidence': True, # Use enhanced completion detection instead of basic patterns
             'project_substantial_work_threshold': 500,  # Minimum total characters in project files
+            'project_merge_lock_timeout': 300,  # Seconds to wait for another process merging into final-project
+            'project_semantic_merge': False,  # Merge *.py/*.ts/*.js with the weave merge driver when installed
             
             # Post-merge finalization settings
             'enable_finalization': True,  # Enable post-merge integration & debugging phase
@@ -2,26 +2,47 @@
 File-based session management using JSON files
 """
 
-import json
+import os
+import sys
+import atexit
 import logging
+import threading
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import List, Optional, Dict, Any, Set, Tuple, Union, NamedTuple
+from dataclasses import dataclass, asdict, fields
 from enum import Enum
 import uuid
+from functools import lru_cache
+from statistics import fmean
 
 from .config import Config
 from .exceptions import SessionError
 from .file_utils import (
-    read_json_file, write_json_file, safe_append_line,
-    update_json_file, ensure_directory, JSONFileStore,
-    rotate_file, FileLock
+    read_json_file, write_json_file, safe_append_line, json_dumps,
+    parse_json_lines, ensure_directory, FileLock
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Append-only log of step transitions, replayed over the steps.json snapshot
+STEPS_LOG_NAME = 'steps_events.log'
+
+# Fold the step log into steps.json once it holds this many records per step
+STEPS_LOG_COMPACT_FACTOR = 4
+
+# Session files only ever replaced by rename, safe to hardlink into the archive
+ARCHIVE_LINKABLE_FILES = frozenset({'session.json', 'steps.json'})
+
+# Upper bound on events.log fds kept open between flushes
+MAX_OPEN_EVENT_LOGS = 32
+
+# Timestamps repeat heavily across a session's records; parse each once
+_parse_iso = lru_cache(maxsize=8192)(datetime.fromisoformat)
+
 
 class SessionStatus(Enum):
     ACTIVE = "active"
@@ -39,9 +60,36 @@ class StepStatus(Enum):
     SKIPPED = "skipped"
 
 
+# Value -> member maps, cheaper than Enum(value) lookups in from_dict
+_SESSION_STATUS_BY_VALUE = {status.value: status for status in SessionStatus}
+_STEP_STATUS_BY_VALUE = {status.value: status for status in StepStatus}
+
+# Console/markdown icon per step status
+_STEP_ICONS = {
+    StepStatus.COMPLETED: "✅",
+    StepStatus.IN_PROGRESS: "🔄",
+    StepStatus.FAILED: "❌",
+    StepStatus.PENDING: "⏳",
+    StepStatus.SKIPPED: "⏭️"
+}
+
+# ANSI color per session status
+_STATUS_COLORS = {
+    SessionStatus.ACTIVE: "\033[34m",  # Blue
+    SessionStatus.COMPLETED: "\033[32m",  # Green
+    SessionStatus.FAILED: "\033[31m",  # Red
+    SessionStatus.INTERRUPTED: "\033[33m",  # Yellow
+    SessionStatus.PAUSED: "\033[35m"  # Magenta
+}
+
+
 @dataclass
 class Session:
     """Build session data model"""
+    # Explicit slots (no per-instance __dict__); dataclass(slots=True) needs 3.10+
+    __slots__ = ('id', 'prompt_file', 'project_name', 'status', 'started_at',
+                 'ended_at', 'current_step', 'total_steps', 'error', 'metadata')
+    
     id: str
     prompt_file: str
     project_name: str
@@ -55,10 +103,15 @@ class Session:
     
     @property
     def duration(self) -> Optional[timedelta]:
-        if self.ended_at:
+        return self.duration_at()
+    
+    def duration_at(self, now: Optional[datetime] = None) -> Optional[timedelta]:
+        """Duration as of `now`; lets listings read the clock once for all rows"""
+        # Ended sessions (most rows in a listing) never need the clock
+        if self.ended_at is not None:
             return self.ended_at - self.started_at
-        elif self.status == SessionStatus.ACTIVE:
-            return datetime.now() - self.started_at
+        elif self.status is SessionStatus.ACTIVE:
+            return (now or datetime.now()) - self.started_at
         return None
     
     @property
@@ -79,16 +132,47 @@ class Session:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Session':
         """Create from dictionary"""
-        data['status'] = SessionStatus(data['status'])
-        data['started_at'] = datetime.fromisoformat(data['started_at'])
+        data['status'] = _SESSION_STATUS_BY_VALUE[data['status']]
+        data['started_at'] = _parse_iso(data['started_at'])
         if data.get('ended_at'):
-            data['ended_at'] = datetime.fromisoformat(data['ended_at'])
+            data['ended_at'] = _parse_iso(data['ended_at'])
         return cls(**data)
+    
+    def to_index_entry(self) -> Dict[str, Any]:
+        """Convert to a sessions index entry (every field except the id key)"""
+        data = self.to_dict()
+        del data['id']
+        return data
+    
+    @classmethod
+    def from_index_entry(cls, session_id: str, entry: Dict[str, Any]) -> Optional['Session']:
+        """Create from a sessions index entry, or None if the entry is incomplete"""
+        if not _SESSION_INDEX_FIELDS.issubset(entry):
+            return None
+        data = dict(entry)
+        data['id'] = session_id
+        return cls.from_dict(data)
+
+
+def _apply_step_transition(step: Dict[str, Any], status: str, timestamp: str):
+    """Apply one logged step transition to a step dict"""
+    step['status'] = status
+    if status == StepStatus.IN_PROGRESS.value:
+        step['started_at'] = timestamp
+    elif status in (StepStatus.COMPLETED.value, StepStatus.FAILED.value):
+        step['completed_at'] = timestamp
+
+
+# Fields an index entry must carry to rebuild a Session without session.json
+_SESSION_INDEX_FIELDS = frozenset(f.name for f in fields(Session)) - {'id'}
 
 
 @dataclass
 class SyncStep:
     """Build step data model"""
+    __slots__ = ('session_id', 'step_number', 'description', 'content', 'status',
+                 'started_at', 'completed_at', 'error')
+    
     session_id: str
     step_number: int
     description: str
@@ -117,17 +201,19 @@ class SyncStep:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SyncStep':
         """Create from dictionary"""
-        data['status'] = StepStatus(data['status'])
+        data['status'] = _STEP_STATUS_BY_VALUE[data['status']]
         if data.get('started_at'):
-            data['started_at'] = datetime.fromisoformat(data['started_at'])
+            data['started_at'] = _parse_iso(data['started_at'])
         if data.get('completed_at'):
-            data['completed_at'] = datetime.fromisoformat(data['completed_at'])
+            data['completed_at'] = _parse_iso(data['completed_at'])
         return cls(**data)
 
 
 @dataclass
 class SessionEvent:
     """Session event for audit trail"""
+    __slots__ = ('session_id', 'timestamp', 'event_type', 'data')
+    
     session_id: str
     timestamp: datetime
     event_type: str
@@ -145,10 +231,41 @@ class SessionEvent:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SessionEvent':
         """Create from dictionary"""
-        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        data['timestamp'] = _parse_iso(data['timestamp'])
         return cls(**data)
 
 
+class SessionPaths(NamedTuple):
+    """Paths of the files in a session directory, joined once per session"""
+    root: Path
+    session_file: Path
+    steps_file: Path
+    steps_log: Path
+    steps_log_compacting: Path
+    events_file: Path
+    
+    @classmethod
+    def for_dir(cls, root: Path) -> 'SessionPaths':
+        return cls(
+            root=root,
+            session_file=root / 'session.json',
+            steps_file=root / 'steps.json',
+            steps_log=root / STEPS_LOG_NAME,
+            steps_log_compacting=root / (STEPS_LOG_NAME + '.compacting'),
+            events_file=root / 'events.log'
+        )
+
+
+@dataclass
+class SummaryBundle:
+    """Session, steps and events serialized together by generate_summary"""
+    __slots__ = ('session', 'steps', 'events')
+    
+    session: Session
+    steps: List[SyncStep]
+    events: List[SessionEvent]
+
+
 class FileSessionManager:
     """Manages sync sessions with file-based backend"""
     
@@ -159,12 +276,54 @@ class FileSessionManager:
         
         # Create sessions index file
         self.index_path = self.sessions_dir / 'sessions_index.json'
+        
+        # Held by every writer of a session.json or the index
+        self.mutex_path = self.sessions_dir / '.mutex'
         if not self.index_path.exists():
             write_json_file(self.index_path, {})
+        
+        # Parsed index, reused until the file's (mtime_ns, size) changes
+        self._index_cache: Optional[Dict[str, Any]] = None
+        self._index_stat: Optional[tuple] = None
+        self._index_by_status: Dict[str, Set[str]] = {}
+        self._index_lock = threading.RLock()
+        
+        # Pool for concurrent legacy session.json reads (see _get_io_pool)
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._io_pool_lock = threading.Lock()
+        
+        # Records appended to each session's step log since its last compaction
+        self._step_log_counts: Dict[str, int] = {}
+        self._step_log_lock = threading.Lock()
+        
+        # Buffered event log: events are queued per session and flushed in
+        # one write per session on a short timer or once enough are pending
+        self._event_buffers: Dict[str, deque] = {}
+        self._pending_events = 0
+        self._event_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._event_flush_interval = config.get('event_flush_interval', 0.05)
+        self._event_flush_max = config.get('event_flush_max_events', 64)
+        
+        # Per-session SessionPaths, dropped once a session is archived or killed
+        self._path_cache: Dict[str, SessionPaths] = {}
+        
+        # events.log fds kept open across flushes (O_APPEND), oldest closed first
+        self._event_fds: 'OrderedDict[str, int]' = OrderedDict()
+        atexit.register(self.close)
     
     def get_session_path(self, session_id: str) -> Path:
         """Get path for session directory"""
-        return self.sessions_dir / session_id
+        return self._session_paths(session_id).root
+    
+    def _session_paths(self, session_id: str) -> SessionPaths:
+        """Get (and cache) the file paths for a session"""
+        paths = self._path_cache.get(session_id)
+        if paths is None:
+            paths = SessionPaths.for_dir(self.sessions_dir / session_id)
+            self._path_cache[session_id] = paths
+        return paths
     
     def create_session(self, prompt) -> Session:
         """Create a new sync session"""
@@ -185,12 +344,8 @@ class FileSessionManager:
         )
         
         # Create session directory
-        session_path = self.get_session_path(session_id)
-        ensure_directory(session_path)
-        
-        # Save session data
-        session_file = session_path / 'session.json'
-        write_json_file(session_file, session.to_dict())
+        paths = self._session_paths(session_id)
+        ensure_directory(paths.root)
         
         # Save steps
         steps = []
@@ -207,46 +362,96 @@ class FileSessionManager:
             )
             steps.append(sync_step.to_dict())
         
-        steps_file = session_path / 'steps.json'
-        write_json_file(steps_file, steps)
+        write_json_file(paths.steps_file, steps)
         
         # Create events log
-        events_file = session_path / 'events.log'
-        events_file.touch()
-        
-        # Log session creation
-        self.log_event(session_id, 'session_created', {
-            'project': prompt.name,
-            'total_steps': len(prompt.steps)
-        })
+        paths.events_file.touch()
         
-        # Update sessions index
-        self._update_index(session_id, 'add', {
-            'project_name': prompt.name,
-            'status': SessionStatus.ACTIVE.value,
-            'started_at': datetime.now().isoformat()
-        })
+        # Save session data, index it and log its creation
+        self._apply_session_change(
+            session_id,
+            session_patch=session.to_dict(),
+            index_patch=session.to_index_entry(),
+            event=('session_created', {
+                'project': prompt.name,
+                'total_steps': len(prompt.steps)
+            })
+        )
         
         logger.info(f"Created session {session_id} for {prompt.name}")
         return session
     
-    def _update_index(self, session_id: str, action: str, data: Optional[Dict] = None):
-        """Update sessions index"""
-        def updater(index):
-            if action == 'add':
-                index[session_id] = data or {}
-            elif action == 'update' and session_id in index:
-                index[session_id].update(data or {})
-            elif action == 'remove' and session_id in index:
-                del index[session_id]
-            return index
+    def _apply_session_change(self, session_id: str,
+                              session_patch: Optional[Dict[str, Any]] = None,
+                              index_patch: Optional[Dict[str, Any]] = None,
+                              event: Optional[Tuple[str, Dict[str, Any]]] = None):
+        """Patch session.json and its index entry in one locked transaction
+        
+        Every writer of session.json and the index holds the sessions mutex,
+        so both files are updated under a single lock instead of one each.
+        The optional (event_type, data) event is queued once the lock is released.
+        """
+        if session_patch or index_patch:
+            with FileLock(self.mutex_path):
+                if session_patch:
+                    session_file = self._session_paths(session_id).session_file
+                    data = read_json_file(session_file, {})
+                    data.update(session_patch)
+                    write_json_file(session_file, data)
+                
+                if index_patch:
+                    with self._index_lock:
+                        index = read_json_file(self.index_path, {})
+                        index.setdefault(session_id, {}).update(index_patch)
+                        write_json_file(self.index_path, index)
+                        self._set_index_cache(index)
+        
+        if event:
+            self.log_event(session_id, *event)
+    
+    def _stat_index(self) -> Optional[tuple]:
+        """Cache key for the index file, or None if it is missing"""
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _set_index_cache(self, index: Dict[str, Any], stat: Optional[tuple] = None):
+        """Remember a parsed index alongside its file stat and status buckets"""
+        by_status: Dict[str, Set[str]] = {}
+        for session_id, info in index.items():
+            by_status.setdefault(info.get('status'), set()).add(session_id)
+        
+        self._index_cache = index
+        self._index_by_status = by_status
+        self._index_stat = stat if stat is not None else self._stat_index()
+    
+    def _read_index(self) -> Dict[str, Any]:
+        """Get the sessions index, reparsing only when the file changed
         
-        update_json_file(self.index_path, updater)
+        The returned dict is shared; callers must not mutate it.
+        """
+        with self._index_lock:
+            stat = self._stat_index()
+            if stat is None:
+                return {}
+            if self._index_cache is None or stat != self._index_stat:
+                self._set_index_cache(read_json_file(self.index_path, {}), stat)
+            return self._index_cache
+    
+    def _read_index_by_status(self, status: SessionStatus) -> Dict[str, Dict[str, Any]]:
+        """Index entries with the given status, without scanning the whole index"""
+        with self._index_lock:
+            index = self._read_index()
+            if not index:
+                return {}
+            session_ids = self._index_by_status.get(status.value, ())
+            return {session_id: index[session_id] for session_id in session_ids}
     
     def get_session(self, session_id: str) -> Optional[Session]:
         """Get session by ID"""
-        session_path = self.get_session_path(session_id)
-        session_file = session_path / 'session.json'
+        session_file = self._session_paths(session_id).session_file
         
         if not session_file.exists():
             return None
@@ -258,13 +463,51 @@ class FileSessionManager:
             logger.error(f"Failed to load session {session_id}: {e}")
             return None
     
+    def _sessions_from_index(self, entries: List[Tuple[str, Dict[str, Any]]]) -> List[Session]:
+        """Build sessions from index entries, in order
+        
+        Only legacy (incomplete) entries need their session.json; when there
+        are several, those reads run concurrently on the shared IO pool.
+        """
+        sessions: List[Optional[Session]] = []
+        missing = []
+        for session_id, info in entries:
+            try:
+                session = Session.from_index_entry(session_id, info)
+            except Exception as e:
+                logger.warning(f"Invalid index entry for session {session_id}: {e}")
+                session = None
+            if session is None:
+                missing.append((len(sessions), session_id))
+            sessions.append(session)
+        
+        if len(missing) > 1:
+            loaded = self._get_io_pool().map(self.get_session, [sid for _, sid in missing])
+        else:
+            loaded = [self.get_session(sid) for _, sid in missing]
+        for (position, _), session in zip(missing, loaded):
+            sessions[position] = session
+        
+        return [session for session in sessions if session]
+    
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        """Thread pool for blocking session file reads, created on first use"""
+        with self._io_pool_lock:
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(
+                    max_workers=min(8, os.cpu_count() or 1),
+                    thread_name_prefix='xsync-io'
+                )
+                atexit.register(self._io_pool.shutdown)
+            return self._io_pool
+    
     def get_active_sessions(self) -> List[Session]:
         """Get all active sessions"""
         return self._get_sessions_by_status(SessionStatus.ACTIVE)
     
     def get_all_sessions(self, limit: int = 100) -> List[Session]:
         """Get all sessions with limit"""
-        index = read_json_file(self.index_path, {})
+        index = self._read_index()
         
         # Sort by started_at descending
         sorted_sessions = sorted(
@@ -273,107 +516,90 @@ class FileSessionManager:
             reverse=True
         )[:limit]
         
-        sessions = []
-        for session_id, _ in sorted_sessions:
-            session = self.get_session(session_id)
-            if session:
-                sessions.append(session)
-        
-        return sessions
+        return self._sessions_from_index(sorted_sessions)
     
     def _get_sessions_by_status(self, status: SessionStatus) -> List[Session]:
         """Get sessions by status"""
-        index = read_json_file(self.index_path, {})
-        sessions = []
-        
-        for session_id, info in index.items():
-            if info.get('status') == status.value:
-                session = self.get_session(session_id)
-                if session:
-                    sessions.append(session)
-        
+        sessions = self._sessions_from_index(list(self._read_index_by_status(status).items()))
         return sorted(sessions, key=lambda s: s.started_at, reverse=True)
     
     def update_session_status(self, session_id: str, status: SessionStatus, 
                             error: Optional[str] = None):
         """Update session status"""
-        session_path = self.get_session_path(session_id)
-        session_file = session_path / 'session.json'
-        
-        if not session_file.exists():
+        if not self._session_paths(session_id).session_file.exists():
             logger.error(f"Session {session_id} not found")
             return
         
         ended_at = datetime.now() if status != SessionStatus.ACTIVE else None
         
-        def updater(data):
-            data['status'] = status.value
-            if ended_at:
-                data['ended_at'] = ended_at.isoformat()
-            if error:
-                data['error'] = error
-            return data
-        
-        update_json_file(session_file, updater)
-        
-        # Update index
-        self._update_index(session_id, 'update', {
+        # The same patch goes to session.json and the index entry;
+        # ended_at is cleared again when a session resumes
+        patch = {
             'status': status.value,
             'ended_at': ended_at.isoformat() if ended_at else None
-        })
+        }
+        if error:
+            patch['error'] = error
         
-        self.log_event(session_id, 'status_changed', {
-            'new_status': status.value,
-            'error': error
-        })
+        self._apply_session_change(
+            session_id,
+            session_patch=patch,
+            index_patch=patch,
+            event=('status_changed', {
+                'new_status': status.value,
+                'error': error
+            })
+        )
+        
+        # Terminal transitions must be durable before the caller moves on,
+        # and the session will not log much more, so release its fd
+        if status != SessionStatus.ACTIVE:
+            self.flush_events(session_id)
+            with self._flush_lock:
+                self._close_event_fd(session_id)
     
     def update_step_progress(self, session_id: str, step_number: int, status: str):
         """Update build step progress"""
-        session_path = self.get_session_path(session_id)
-        steps_file = session_path / 'steps.json'
+        paths = self._session_paths(session_id)
         
-        if not steps_file.exists():
+        if not paths.steps_file.exists():
             logger.error(f"Steps file not found for session {session_id}")
             return
         
         step_status = StepStatus(status)
         now = datetime.now()
         
-        def updater(steps):
-            for step in steps:
-                if step['step_number'] == step_number:
-                    step['status'] = step_status.value
-                    
-                    if step_status == StepStatus.IN_PROGRESS:
-                        step['started_at'] = now.isoformat()
-                    elif step_status in [StepStatus.COMPLETED, StepStatus.FAILED]:
-                        step['completed_at'] = now.isoformat()
-                    
-                    break
-            return steps
-        
-        update_json_file(steps_file, updater)
-        
-        # Update session current step if in progress
+        # Record the transition instead of rewriting steps.json; readers
+        # replay the log on top of the steps.json snapshot. The steps.json
+        # lock keeps compaction from moving the log aside mid-append
+        with FileLock(paths.steps_file):
+            safe_append_line(paths.steps_log, json_dumps({
+                'n': step_number,
+                's': step_status.value,
+                't': now.isoformat()
+            }))
+        self._maybe_compact_steps(session_id, paths.steps_log)
+        
+        # Update session current step if in progress; the cached index says
+        # whether it already is, in which case neither file needs rewriting
+        patch = None
         if step_status == StepStatus.IN_PROGRESS:
-            session_file = session_path / 'session.json'
-            
-            def session_updater(data):
-                data['current_step'] = step_number
-                return data
-            
-            update_json_file(session_file, session_updater)
+            entry = self._read_index().get(session_id, {})
+            if entry.get('current_step') != step_number:
+                patch = {'current_step': step_number}
         
-        self.log_event(session_id, 'step_progress', {
-            'step_number': step_number,
-            'status': status
-        })
+        self._apply_session_change(
+            session_id,
+            session_patch=patch,
+            index_patch=patch,
+            event=('step_progress', {
+                'step_number': step_number,
+                'status': status
+            })
+        )
     
     def log_event(self, session_id: str, event_type: str, data: Dict[str, Any]):
-        """Log a session event"""
-        session_path = self.get_session_path(session_id)
-        events_file = session_path / 'events.log'
-        
+        """Log a session event (buffered, see flush_events)"""
         event = SessionEvent(
             session_id=session_id,
             timestamp=datetime.now(),
@@ -381,51 +607,219 @@ class FileSessionManager:
             data=data
         )
         
-        # Append to log file
-        log_line = json.dumps(event.to_dict(), default=str)
-        safe_append_line(events_file, log_line)
+        log_line = json_dumps(event.to_dict())
+        
+        with self._event_lock:
+            self._event_buffers.setdefault(session_id, deque()).append(log_line)
+            self._pending_events += 1
+            flush_now = self._pending_events >= self._event_flush_max
+            if not flush_now and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._event_flush_interval,
+                                                    self.flush_events)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if flush_now:
+            self.flush_events()
+    
+    def flush_events(self, session_id: Optional[str] = None):
+        """Write buffered events to events.log, one append per session"""
+        # The flush lock keeps concurrent flushes from reordering a session's events
+        with self._flush_lock:
+            with self._event_lock:
+                if session_id is None:
+                    batches = self._event_buffers
+                    self._event_buffers = {}
+                    self._pending_events = 0
+                    if self._flush_timer is not None:
+                        self._flush_timer.cancel()
+                        self._flush_timer = None
+                else:
+                    buffer = self._event_buffers.pop(session_id, None)
+                    batches = {session_id: buffer} if buffer else {}
+                    if buffer:
+                        self._pending_events -= len(buffer)
+            
+            for sid, lines in batches.items():
+                if not lines:
+                    continue
+                data = ('\n'.join(lines) + '\n').encode('utf-8')
+                try:
+                    fd = self._event_fd(sid)
+                    while data:
+                        written = os.write(fd, data)
+                        data = data[written:]
+                except Exception as e:
+                    logger.error(f"Failed to flush {len(lines)} events for session {sid}: {e}")
+                    self._close_event_fd(sid)
     
-    def get_session_events(self, session_id: str) -> List[SessionEvent]:
-        """Get all events for a session"""
-        session_path = self.get_session_path(session_id)
-        events_file = session_path / 'events.log'
+    def _event_fd(self, session_id: str) -> int:
+        """Get the cached O_APPEND fd for a session's events.log (flush lock held)"""
+        fd = self._event_fds.get(session_id)
+        if fd is not None:
+            self._event_fds.move_to_end(session_id)
+            return fd
         
-        if not events_file.exists():
-            return []
+        events_file = self._session_paths(session_id).events_file
+        events_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(events_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._event_fds[session_id] = fd
+        
+        while len(self._event_fds) > MAX_OPEN_EVENT_LOGS:
+            _, oldest = self._event_fds.popitem(last=False)
+            os.close(oldest)
+        return fd
+    
+    def _close_event_fd(self, session_id: str):
+        """Close a session's cached events.log fd, if any"""
+        fd = self._event_fds.pop(session_id, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    
+    def close(self):
+        """Flush buffered events and close cached event log fds"""
+        self.flush_events()
+        with self._flush_lock:
+            for session_id in list(self._event_fds):
+                self._close_event_fd(session_id)
+    
+    def get_session_events(self, session_id: str, since: Optional[datetime] = None,
+                           event_types: Optional[Set[str]] = None,
+                           limit: Optional[int] = None) -> List[SessionEvent]:
+        """Get events for a session
+        
+        Args:
+            session_id: Session ID
+            since: Only return events after this time
+            event_types: Only return events of these types
+            limit: Only return the most recent matching events
+        """
+        self.flush_events(session_id)
+        events_file = self._session_paths(session_id).events_file
         
-        events = []
         try:
-            with open(events_file, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            data = json.loads(line)
-                            events.append(SessionEvent.from_dict(data))
-                        except json.JSONDecodeError:
-                            continue
+            records = parse_json_lines(events_file.read_bytes())
+        except FileNotFoundError:
+            return []
         except Exception as e:
             logger.error(f"Failed to read events for session {session_id}: {e}")
+            return []
+        
+        # Filter on the raw dicts so skipped events never become SessionEvents
+        matched = records
+        if event_types is not None or since is not None:
+            matched = []
+            for data in records:
+                try:
+                    if event_types is not None and data.get('event_type') not in event_types:
+                        continue
+                    if since is not None and _parse_iso(data['timestamp']) <= since:
+                        continue
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                matched.append(data)
+        
+        if limit is not None:
+            matched = matched[-limit:] if limit > 0 else []
+        
+        events = []
+        for data in matched:
+            try:
+                events.append(SessionEvent.from_dict(data))
+            except Exception as e:
+                logger.debug(f"Skipping malformed event in session {session_id}: {e}")
         
         return events
     
+    def _load_step_dicts(self, paths: SessionPaths) -> List[Dict[str, Any]]:
+        """Read the steps.json snapshot and replay logged transitions onto it
+        
+        Holds the steps.json lock so compaction cannot swap the snapshot and
+        logs between the reads.
+        """
+        with FileLock(paths.steps_file):
+            steps = read_json_file(paths.steps_file, [])
+            by_number = {step['step_number']: step for step in steps}
+            
+            # A log being compacted is replayed first, it predates the live one
+            for log_path in (paths.steps_log_compacting, paths.steps_log):
+                try:
+                    records = parse_json_lines(log_path.read_bytes())
+                except FileNotFoundError:
+                    continue
+                for record in records:
+                    try:
+                        step = by_number.get(record['n'])
+                    except (KeyError, TypeError):
+                        continue
+                    if step is not None:
+                        _apply_step_transition(step, record['s'], record['t'])
+        
+        return steps
+    
+    def _maybe_compact_steps(self, session_id: str, steps_log: Path):
+        """Compact the step log once it grows past a few records per step"""
+        with self._step_log_lock:
+            count = self._step_log_counts.get(session_id)
+            if count is None:
+                try:
+                    count = steps_log.read_bytes().count(b'\n')
+                except FileNotFoundError:
+                    count = 0
+            else:
+                count += 1
+            self._step_log_counts[session_id] = count
+        
+        total_steps = self._read_index().get(session_id, {}).get('total_steps') or 1
+        if count > STEPS_LOG_COMPACT_FACTOR * total_steps:
+            self.compact_steps(session_id)
+    
+    def compact_steps(self, session_id: str):
+        """Fold the step transition log back into steps.json"""
+        paths = self._session_paths(session_id)
+        steps_file = paths.steps_file
+        compacting = paths.steps_log_compacting
+        
+        with FileLock(steps_file):
+            # Move the log aside first so concurrent appends start a new one
+            if not compacting.exists():
+                try:
+                    os.rename(paths.steps_log, compacting)
+                except FileNotFoundError:
+                    return
+            
+            write_json_file(steps_file, self._load_step_dicts(paths))
+            compacting.unlink()
+        
+        with self._step_log_lock:
+            self._step_log_counts.pop(session_id, None)
+    
     def get_session_steps(self, session_id: str) -> List[SyncStep]:
         """Get all steps for a session"""
-        session_path = self.get_session_path(session_id)
-        steps_file = session_path / 'steps.json'
+        paths = self._session_paths(session_id)
         
-        if not steps_file.exists():
+        if not paths.steps_file.exists():
             return []
         
         try:
-            steps_data = read_json_file(steps_file, [])
+            steps_data = self._load_step_dicts(paths)
             return [SyncStep.from_dict(step) for step in steps_data]
         except Exception as e:
             logger.error(f"Failed to load steps for session {session_id}: {e}")
             return []
     
-    def archive_session(self, session_id: str, status: str = 'completed'):
+    def archive_session(self, session_id: str,
+                        status: Union[str, SessionStatus] = 'completed'):
         """Archive a session"""
-        session_status = SessionStatus(status.upper())
+        if isinstance(status, SessionStatus):
+            session_status = status
+        else:
+            # Enum values are lowercase ('completed'), accept any casing
+            session_status = SessionStatus(status.lower())
+        status = session_status.value
         self.update_session_status(session_id, session_status)
         
         # Create archive directory if needed
@@ -433,14 +827,34 @@ class FileSessionManager:
             archive_dir = self.sessions_dir / 'archive' / session_id
             archive_dir.mkdir(parents=True, exist_ok=True)
             
-            # Copy session files to archive
+            # Only files that are always replaced by temp+rename can be
+            # hardlinked; the append-only logs keep growing in place after
+            # archiving, so they are copied (sendfile under the hood)
+            self.flush_events(session_id)
             session_path = self.get_session_path(session_id)
             if session_path.exists():
                 import shutil
-                for file in session_path.iterdir():
-                    if file.is_file():
-                        shutil.copy2(file, archive_dir / file.name)
+                same_device = os.stat(session_path).st_dev == os.stat(archive_dir).st_dev
+                # scandir's DirEntry answers is_file() from readdir, no extra stat
+                with os.scandir(session_path) as entries:
+                    for entry in entries:
+                        # Lock files are coordination state, not session data
+                        if (not entry.is_file(follow_symlinks=False)
+                                or entry.name.endswith('.lock')):
+                            continue
+                        target = os.path.join(archive_dir, entry.name)
+                        # Never write through an older archive's hardlink
+                        if os.path.lexists(target):
+                            os.unlink(target)
+                        if same_device and entry.name in ARCHIVE_LINKABLE_FILES:
+                            try:
+                                os.link(entry.path, target)
+                                continue
+                            except OSError:
+                                same_device = False  # e.g. no hardlink support
+                        shutil.copy2(entry.path, target)
         
+        self._path_cache.pop(session_id, None)
         logger.info(f"Archived session {session_id} with status {status}")
     
     def kill_session(self, session_id: str) -> bool:
@@ -451,6 +865,7 @@ class FileSessionManager:
         
         # Update status
         self.update_session_status(session_id, SessionStatus.INTERRUPTED)
+        self._path_cache.pop(session_id, None)
         
         # Kill tmux session if using tmux
         if self.config.use_tmux:
@@ -485,36 +900,35 @@ class FileSessionManager:
     
     def count_sessions(self) -> int:
         """Get total number of sessions"""
-        index = read_json_file(self.index_path, {})
+        index = self._read_index()
         return len(index)
     
     def get_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get session statistics"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        index = read_json_file(self.index_path, {})
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        index = self._read_index()
         
-        # Filter sessions by date
-        recent_sessions = {}
-        for session_id, info in index.items():
-            if 'started_at' in info:
-                started_at = datetime.fromisoformat(info['started_at'])
-                if started_at > cutoff_date:
-                    recent_sessions[session_id] = info
+        # Filter sessions by date, straight from the index entries
+        recent_sessions = []
+        for info in index.values():
+            if info.get('started_at'):
+                started_at = _parse_iso(info['started_at']).timestamp()
+                if started_at > cutoff:
+                    recent_sessions.append((info, started_at))
         
         # Count by status
-        status_counts = {}
-        for info in recent_sessions.values():
-            status = info.get('status', 'unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = dict(Counter(info.get('status', 'unknown')
+                                     for info, _ in recent_sessions))
         
-        # Calculate average duration for completed sessions
-        durations = []
-        for session_id in recent_sessions:
-            session = self.get_session(session_id)
-            if session and session.status == SessionStatus.COMPLETED and session.duration:
-                durations.append(session.duration.total_seconds() / 60)  # minutes
+        # Average duration (minutes) for completed sessions; terminal
+        # transitions always stamp ended_at into the index
+        durations = [
+            (_parse_iso(info['ended_at']).timestamp() - started_at) / 60
+            for info, started_at in recent_sessions
+            if info.get('status') == SessionStatus.COMPLETED.value and info.get('ended_at')
+        ]
         
-        avg_duration_minutes = sum(durations) / len(durations) if durations else 0
+        avg_duration_minutes = fmean(durations) if durations else 0
         
         # Success rate
         completed = status_counts.get(SessionStatus.COMPLETED.value, 0)
@@ -541,12 +955,8 @@ class FileSessionManager:
         if format == 'markdown':
             return self._generate_markdown_summary(session, steps, events)
         elif format == 'json':
-            data = {
-                'session': session.to_dict(),
-                'steps': [step.to_dict() for step in steps],
-                'events': [event.to_dict() for event in events]
-            }
-            return json.dumps(data, indent=2, default=str)
+            # Serialized field by field (natively by orjson), no to_dict copies
+            return json_dumps(SummaryBundle(session, steps, events), indent=2)
         elif format == 'html':
             return self._generate_html_summary(session, steps, events)
         else:
@@ -571,13 +981,7 @@ class FileSessionManager:
 """
         
         for step in steps:
-            icon = {
-                StepStatus.COMPLETED: "✅",
-                StepStatus.IN_PROGRESS: "🔄",
-                StepStatus.FAILED: "❌",
-                StepStatus.PENDING: "⏳",
-                StepStatus.SKIPPED: "⏭️"
-            }.get(step.status, "❓")
+            icon = _STEP_ICONS.get(step.status, "❓")
             
             summary += f"\n{icon} **Step {step.step_number}**: {step.description or 'N/A'}\n"
             if step.duration:
@@ -641,43 +1045,50 @@ class FileSessionManager:
         
         return html
     
-    def display_session_summary(self, session: Session):
-        """Display session summary to console"""
-        status_colors = {
-            SessionStatus.ACTIVE: "\033[34m",  # Blue
-            SessionStatus.COMPLETED: "\033[32m",  # Green
-            SessionStatus.FAILED: "\033[31m",  # Red
-            SessionStatus.INTERRUPTED: "\033[33m",  # Yellow
-            SessionStatus.PAUSED: "\033[35m"  # Magenta
-        }
-        
-        color = status_colors.get(session.status, "")
+    def _format_session_summary(self, session: Session,
+                                now: Optional[datetime] = None) -> List[str]:
+        """Console lines for a session summary"""
+        color = _STATUS_COLORS.get(session.status, "")
         reset = "\033[0m"
         
-        print(f"{color}● {session.id[:8]}{reset} - {session.project_name}")
-        print(f"  Status: {session.status.value} | Progress: {session.current_step}/{session.total_steps}")
-        if session.duration:
-            print(f"  Duration: {session.duration}")
+        lines = [
+            f"{color}● {session.id[:8]}{reset} - {session.project_name}",
+            f"  Status: {session.status.value} | Progress: {session.current_step}/{session.total_steps}"
+        ]
+        duration = session.duration_at(now)
+        if duration:
+            lines.append(f"  Duration: {duration}")
+        return lines
+    
+    def display_session_summary(self, session: Session):
+        """Display session summary to console"""
+        sys.stdout.write("\n".join(self._format_session_summary(session)) + "\n")
+    
+    def display_session_summaries(self, sessions: List[Session]):
+        """Display summaries for a list of sessions with a single write"""
+        now = datetime.now()
+        lines = []
+        for session in sessions:
+            lines.extend(self._format_session_summary(session, now))
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
     
     def display_session_status(self, session: Session, detailed: bool = False):
         """Display detailed session status"""
-        self.display_session_summary(session)
+        lines = self._format_session_summary(session)
         
         if detailed:
-            print("\nSteps:")
-            steps = self.get_session_steps(session.id)
+            lines.append("\nSteps:")
+            steps = self.get_session_steps(session.id) if session.total_steps else []
             for step in steps:
-                icon = {
-                    StepStatus.COMPLETED: "✅",
-                    StepStatus.IN_PROGRESS: "🔄",
-                    StepStatus.FAILED: "❌",
-                    StepStatus.PENDING: "⏳",
-                    StepStatus.SKIPPED: "⏭️"
-                }.get(step.status, "❓")
+                icon = _STEP_ICONS.get(step.status, "❓")
                 
-                print(f"  {icon} Step {step.step_number}: {step.description or 'N/A'}")
+                lines.append(f"  {icon} Step {step.step_number}: {step.description or 'N/A'}")
                 if step.duration:
-                    print(f"     Duration: {step.duration}")
+                    lines.append(f"     Duration: {step.duration}")
+        
+        # One write for the whole block
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def display_statistics(self, stats: Dict[str, Any]):
         """Display statistics to console"""
@@ -4,72 +4,156 @@ File utilities for atomic operations and file-based coordination
 
 import json
 import os
+import stat
 import fcntl
+import fnmatch
+import re
 import tempfile
 import shutil
 import time
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Callable
-from datetime import datetime, timedelta
+from datetime import datetime
 from contextlib import contextmanager
+from enum import Enum
+from dataclasses import is_dataclass, fields
+
+try:
+    import orjson
+except ImportError:  # Optional C-accelerated JSON, see the 'fast' extra
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+NS_PER_HOUR = 3600 * 10**9
+
+
+class _ProcessLock:
+    """In-process state shared by every FileLock on the same lock file"""
+    __slots__ = ('rlock', 'depth', 'users', 'lock_file')
+    
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.depth = 0  # Nesting depth of the thread holding rlock
+        self.users = 0  # FileLocks holding or waiting for this entry
+        self.lock_file = None
+
+
+# Lock file path -> _ProcessLock. Threads of this process queue on the RLock
+# and only the outermost holder takes the flock, so nested or repeated
+# FileLocks on the same path in one thread do not deadlock on their own flock.
+_process_locks: Dict[str, _ProcessLock] = {}
+_process_locks_guard = threading.Lock()
+
+
+def _flock_with_deadline(lock_file, deadline: float) -> bool:
+    """Take an exclusive flock, retrying with a short backoff until deadline"""
+    delay = 0.001
+    while True:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            pass
+        
+        # A blocking flock cannot be given a timeout portably (SIGALRM only
+        # works on the main thread), so the wait stays in userspace
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+def _open_lock_file(key: str):
+    """Open a '<path>.lock' file, recreating its directory if it was removed"""
+    try:
+        return open(key, 'a+')
+    except FileNotFoundError:
+        parent = os.path.dirname(key)
+        forget_dir(parent)
+        _ensure_dir(parent)
+        return open(key, 'a+')
+
 
 class FileLock:
-    """Simple file-based lock using fcntl (Unix) or file existence (Windows)"""
+    """File-based lock using fcntl.flock on a persistent '<path>.lock' file
+    
+    Reentrant within a thread; other threads of the same process wait on an
+    in-process lock rather than on the flock.
+    """
     
     def __init__(self, path: Path, timeout: int = 30):
         self.path = path
         self.timeout = timeout
         self.lock_file = None
         self.locked = False
+        self._entry: Optional[_ProcessLock] = None
     
     def acquire(self) -> bool:
         """Acquire the lock"""
-        start_time = time.time()
-        lock_path = Path(str(self.path) + '.lock')
+        deadline = time.monotonic() + self.timeout
+        key = str(self.path) + '.lock'
+        
+        with _process_locks_guard:
+            entry = _process_locks.get(key)
+            if entry is None:
+                entry = _process_locks[key] = _ProcessLock()
+            entry.users += 1
+        
+        if not entry.rlock.acquire(timeout=max(self.timeout, 0)):
+            self._drop_entry(key, entry)
+            return False
         
-        while time.time() - start_time < self.timeout:
+        if entry.depth == 0:
             try:
-                # Try to create lock file exclusively
-                self.lock_file = open(lock_path, 'x')
-                
-                # On Unix, also use fcntl for extra safety
-                if hasattr(fcntl, 'flock'):
-                    fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-                
-                self.locked = True
-                return True
-                
-            except (FileExistsError, IOError):
-                # Lock is held by another process
-                time.sleep(0.1)
-                continue
+                # The lock file is left in place on release; the flock on it
+                # is the lock, so there is no create/unlink race
+                lock_file = _open_lock_file(key)
+            except OSError:
+                entry.rlock.release()
+                self._drop_entry(key, entry)
+                raise
+            if not _flock_with_deadline(lock_file, deadline):
+                lock_file.close()
+                entry.rlock.release()
+                self._drop_entry(key, entry)
+                return False
+            entry.lock_file = lock_file
         
-        return False
+        entry.depth += 1
+        self._entry = entry
+        self.lock_file = entry.lock_file
+        self.locked = True
+        return True
+    
+    @staticmethod
+    def _drop_entry(key: str, entry: _ProcessLock):
+        with _process_locks_guard:
+            entry.users -= 1
+            if entry.users == 0 and _process_locks.get(key) is entry:
+                del _process_locks[key]
     
     def release(self):
         """Release the lock"""
-        if self.locked and self.lock_file:
+        if self.locked and self._entry:
+            entry = self._entry
             try:
-                # Release fcntl lock if on Unix
-                if hasattr(fcntl, 'flock'):
-                    fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
-                
-                self.lock_file.close()
-                
-                # Remove lock file
-                lock_path = Path(str(self.path) + '.lock')
-                if lock_path.exists():
-                    lock_path.unlink()
-                    
+                entry.depth -= 1
+                if entry.depth == 0:
+                    fcntl.flock(entry.lock_file.fileno(), fcntl.LOCK_UN)
+                    entry.lock_file.close()
+                    entry.lock_file = None
             except Exception as e:
                 logger.warning(f"Error releasing lock: {e}")
             finally:
+                entry.rlock.release()
+                self._drop_entry(str(self.path) + '.lock', entry)
                 self.locked = False
                 self.lock_file = None
+                self._entry = None
     
     def __enter__(self):
         if not self.acquire():
@@ -80,21 +164,133 @@ class FileLock:
         self.release()
 
 
+def _json_default(obj: Any) -> Any:
+    """Serialize values JSON has no type for (enums by value, the rest via str)"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow: nested values come back through this hook
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    return str(obj)
+
+
+def _json_dumps_bytes(data: Any, indent: Optional[int] = None) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed
+    
+    orjson encodes datetimes natively (ISO 8601) and only indents by 2, so
+    other indents go through the stdlib encoder.
+    """
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=_json_default, option=option)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder copes
+    # ensure_ascii=True takes the stdlib's ASCII-only escaping fast path;
+    # the payloads here are nearly all ASCII and any reader decodes \u escapes
+    return json.dumps(data, indent=indent, default=_json_default,
+                      ensure_ascii=True).encode('ascii')
+
+
+def json_dumps(data: Any, indent: Optional[int] = None) -> str:
+    """Serialize to a JSON string, using orjson when it is installed"""
+    return _json_dumps_bytes(data, indent).decode('utf-8')
+
+
+def json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def parse_json_lines(data: bytes) -> List[Any]:
+    """Parse a JSON-lines buffer, skipping blank and malformed lines
+    
+    The whole buffer is parsed in one comprehension; only if some line is
+    malformed does it fall back to parsing line by line.
+    """
+    lines = [line for line in data.splitlines() if line.strip()]
+    try:
+        return [json_loads(line) for line in lines]
+    except ValueError:
+        records = []
+        for line in lines:
+            try:
+                records.append(json_loads(line))
+            except ValueError:
+                continue
+        return records
+
+
+# Directories this process has already created or found to exist
+_ensured_dirs: set = set()
+_ensured_dirs_lock = threading.Lock()
+
+
+def _ensure_dir(directory: Path):
+    """mkdir -p a directory, once per process
+    
+    Writers that then fail with FileNotFoundError call forget_dir() and
+    retry, so a directory removed behind our back is recreated.
+    """
+    key = os.fspath(directory)
+    if key in _ensured_dirs:
+        return
+    os.makedirs(key, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(key)
+
+
+def forget_dir(directory: Path):
+    """Forget that a directory (and anything below it) was created"""
+    key = os.fspath(directory)
+    prefix = key.rstrip(os.sep) + os.sep
+    with _ensured_dirs_lock:
+        for known in [d for d in _ensured_dirs if d == key or d.startswith(prefix)]:
+            _ensured_dirs.discard(known)
+
+
 @contextmanager
-def atomic_write(path: Path, mode: str = 'w'):
-    """Context manager for atomic file writes using temp file + rename"""
+def atomic_write(path: Path, mode: str = 'w', durable: bool = True):
+    """Context manager for atomic file writes using temp file + rename
+    
+    With durable=False the file is truncated and written in place instead,
+    skipping the temp file and rename; only for files whose writers are
+    already serialized and whose readers tolerate a torn read.
+    """
     path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(path.parent)
+    
+    if not durable:
+        try:
+            f = open(path, mode)
+        except FileNotFoundError:
+            forget_dir(path.parent)
+            _ensure_dir(path.parent)
+            f = open(path, mode)
+        with f:
+            yield f
+        return
     
     # Create temp file in same directory for atomic rename
-    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp_')
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp_')
+    except FileNotFoundError:
+        forget_dir(path.parent)
+        _ensure_dir(path.parent)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp_')
     
     try:
         with os.fdopen(fd, mode) as f:
             yield f
         
-        # Atomic rename
-        shutil.move(temp_path, path)
+        # Atomic rename; mkstemp put the temp file on the target's filesystem
+        os.replace(temp_path, path)
         
     except Exception:
         # Clean up temp file on error
@@ -105,30 +301,35 @@ def atomic_write(path: Path, mode: str = 'w'):
 
 def read_json_file(path: Path, default: Optional[Any] = None) -> Any:
     """Read JSON file with optional default value"""
+    if default is None:
+        default = {}
     try:
-        if not path.exists():
-            return default if default is not None else {}
-        
-        with open(path, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
+        return _read_json_fd(path, default)
+    except OSError as e:
         logger.warning(f"Error reading JSON from {path}: {e}")
-        return default if default is not None else {}
+        return default
 
 
-def write_json_file(path: Path, data: Any, indent: int = 2):
-    """Write JSON file atomically"""
+def write_json_file(path: Path, data: Any, indent: int = 2, durable: bool = True):
+    """Write JSON file atomically (in place when durable is False)"""
     path = Path(path)
+    payload = _json_dumps_bytes(data, indent)
     
-    with atomic_write(path) as f:
-        json.dump(data, f, indent=indent, default=str, ensure_ascii=False)
+    with atomic_write(path, 'wb', durable=durable) as f:
+        f.write(payload)
 
 
-def append_to_json_array(path: Path, item: Any, max_items: Optional[int] = None) -> List:
-    """Append item to JSON array file atomically"""
-    with FileLock(path):
-        data = read_json_file(path, default=[])
-        
+def append_to_json_array(path: Path, item: Any, max_items: Optional[int] = None,
+                         atomic: bool = True) -> List:
+    """Append item to JSON array file under the file's lock
+    
+    atomic=False splices the item in place instead of rewriting the file;
+    only for files whose readers all take the lock.
+    """
+    if not atomic and not max_items:
+        return _splice_json_array_item(Path(path), item)
+    
+    def updater(data):
         if not isinstance(data, list):
             data = []
         
@@ -138,92 +339,284 @@ def append_to_json_array(path: Path, item: Any, max_items: Optional[int] = None)
         if max_items and len(data) > max_items:
             data = data[-max_items:]
         
-        write_json_file(path, data)
+        return data
+    
+    return _locked_rmw(path, updater, [], atomic=atomic)
+
+
+def _splice_json_array_item(path: Path, item: Any) -> List:
+    """Append to a JSON array file by rewriting only its closing bracket
+    
+    The existing array is still parsed, for the return value and to check
+    the file really is a non-empty array; anything else is rewritten whole.
+    """
+    with FileLock(path):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            buf = os.pread(fd, size, 0) if size else b''
+            data = _parse_json_buf(buf, path, [])
+            
+            if isinstance(data, list) and data:
+                # Overwrite from just after the last element, through ']'
+                offset = len(buf.rstrip()[:-1].rstrip())
+                payload = b',\n  ' + _json_dumps_bytes(item) + b'\n]'
+            else:
+                data = [] if not isinstance(data, list) else data
+                offset = 0
+                payload = _json_dumps_bytes([item], 2)
+            data.append(item)
+            
+            view = memoryview(payload)
+            written = 0
+            while written < len(payload):
+                written += os.pwrite(fd, view[written:], offset + written)
+            os.ftruncate(fd, offset + len(payload))
+        finally:
+            os.close(fd)
         return data
 
 
-def update_json_file(path: Path, updater: Callable[[Any], Any]) -> Any:
-    """Update JSON file atomically with a function"""
+def _parse_json_buf(buf: bytes, path: Path, default: Any) -> Any:
+    """Parse a JSON file's raw contents, falling back to default"""
+    if not buf.strip():
+        return default
+
+    try:
+        return json_loads(buf)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.warning(f"Error reading JSON from {path}: {e}")
+        return default
+
+
+def _read_json_fd(path: Path, default: Any) -> Any:
+    """Read JSON through a single fd, sized from fstat (no exists() probe)"""
+    try:
+        buf = _read_bytes_fd(path)
+    except FileNotFoundError:
+        return default
+
+    return _parse_json_buf(buf, path, default)
+
+
+def _locked_rmw(path: Path, updater: Callable[[Any], Any], default: Any,
+                atomic: bool = True) -> Any:
+    """Read-modify-write a JSON file under its FileLock
+    
+    By default the new contents go through temp file + rename. With
+    atomic=False the file is rewritten in place through one O_RDWR fd
+    (pread, pwrite, ftruncate), skipping the temp file and rename; readers
+    that do not take the lock could then see a partial file, and a crash
+    mid-write can leave one behind, so only opt in when every reader locks.
+    """
+    path = Path(path)
     with FileLock(path):
-        data = read_json_file(path)
-        updated_data = updater(data)
-        write_json_file(path, updated_data)
+        if atomic:
+            data = _read_json_fd(path, default)
+            updated_data = updater(data)
+            write_json_file(path, updated_data)
+            return updated_data
+        
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            buf = os.pread(fd, size, 0) if size else b''
+            updated_data = updater(_parse_json_buf(buf, path, default))
+            
+            payload = _json_dumps_bytes(updated_data, 2)
+            view = memoryview(payload)
+            offset = 0
+            while offset < len(payload):
+                offset += os.pwrite(fd, view[offset:], offset)
+            # Truncate after writing so the file is never seen empty
+            os.ftruncate(fd, len(payload))
+        finally:
+            os.close(fd)
         return updated_data
 
 
+def update_json_file(path: Path, updater: Callable[[Any], Any],
+                     atomic: bool = True) -> Any:
+    """Update JSON file under its lock with a function
+    
+    Args:
+        path: JSON file to update
+        updater: Called with the current contents, returns the new contents
+        atomic: Write through temp file + rename so a crash or an unlocked
+            reader never sees a partial file; pass False to rewrite in place
+            when every reader of the file takes its lock
+    """
+    return _locked_rmw(path, updater, {}, atomic=atomic)
+
+
 def ensure_directory(path: Path) -> Path:
     """Ensure directory exists"""
     path = Path(path)
     path.mkdir(parents=True, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(os.fspath(path))
     return path
 
 
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """Stat a path in one syscall, None if it does not exist"""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _iter_matching_files(directory: Path, pattern: str):
+    """Yield (path, stat) for regular files in directory matching pattern
+    
+    Plain name patterns are matched against one os.scandir listing, so
+    is_file() comes from the entry's d_type and stat() is cached per entry;
+    patterns that reach into subdirectories still go through Path.glob.
+    """
+    if '/' in pattern or os.sep in pattern:
+        for file_path in directory.glob(pattern):
+            st = _stat_or_none(file_path)
+            if st is not None and stat.S_ISREG(st.st_mode):
+                yield file_path, st
+        return
+    
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not fnmatch.fnmatchcase(entry.name, pattern):
+                continue
+            try:
+                if entry.is_file():
+                    yield Path(entry.path), entry.stat()
+            except FileNotFoundError:
+                continue  # Removed since the directory was listed
+
+
 def cleanup_old_files(directory: Path, pattern: str, hours: int = 24):
     """Clean up files older than specified hours"""
-    if not directory.exists():
-        return 0
-    
-    cutoff_time = datetime.now() - timedelta(hours=hours)
+    cutoff_ns = time.time_ns() - int(hours * NS_PER_HOUR)
     cleaned = 0
     
-    for file_path in directory.glob(pattern):
-        if file_path.is_file():
-            # Check file modification time
-            mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-            if mtime < cutoff_time:
+    if '/' in pattern or os.sep in pattern:
+        if not directory.exists():
+            return 0
+        for file_path, st in _iter_matching_files(directory, pattern):
+            if st.st_mtime_ns < cutoff_ns:
                 try:
                     file_path.unlink()
                     cleaned += 1
                 except Exception as e:
                     logger.warning(f"Failed to clean up {file_path}: {e}")
+        return cleaned
+    
+    # Scan, stat and unlink relative to one directory fd, so each call is
+    # an *at() syscall on a bare name instead of re-resolving the full path
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+    
+    try:
+        with os.scandir(dir_fd) as entries:
+            for entry in entries:
+                if not fnmatch.fnmatchcase(entry.name, pattern):
+                    continue
+                try:
+                    if not entry.is_file() or entry.stat().st_mtime_ns >= cutoff_ns:
+                        continue
+                    os.unlink(entry.name, dir_fd=dir_fd)
+                    cleaned += 1
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.warning(f"Failed to clean up {Path(directory) / entry.name}: {e}")
+    finally:
+        os.close(dir_fd)
     
     return cleaned
 
 
 def is_file_stale(path: Path, hours: int = 2) -> bool:
     """Check if a file is older than specified hours"""
-    if not path.exists():
+    st = _stat_or_none(path)
+    if st is None:
         return False
     
-    mtime = datetime.fromtimestamp(path.stat().st_mtime)
-    age = datetime.now() - mtime
-    return age.total_seconds() > (hours * 3600)
+    return time.time_ns() - st.st_mtime_ns > hours * NS_PER_HOUR
+
+
+def _read_bytes_fd(path: Path) -> bytes:
+    """Read a whole file through one fd, sized from fstat"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        return os.read(fd, size) if size else b''
+    finally:
+        os.close(fd)
 
 
 def safe_read_lines(path: Path, max_lines: Optional[int] = None) -> List[str]:
     """Safely read lines from a file"""
     try:
-        if not path.exists():
-            return []
-        
-        with open(path, 'r') as f:
-            if max_lines:
-                lines = []
-                for i, line in enumerate(f):
-                    if i >= max_lines:
-                        break
-                    lines.append(line.rstrip('\n'))
-                return lines
-            else:
-                return [line.rstrip('\n') for line in f]
-                
+        data = _read_bytes_fd(path)
+    except FileNotFoundError:
+        return []
     except Exception as e:
         logger.warning(f"Error reading lines from {path}: {e}")
         return []
+    
+    if max_lines:
+        # Only split the head of the file; the tail past the last wanted
+        # newline is never scanned
+        end = -1
+        for _ in range(max_lines):
+            end = data.find(b'\n', end + 1)
+            if end < 0:
+                break
+        head = data if end < 0 else data[:end + 1]
+        lines = head.splitlines()[:max_lines]
+    else:
+        # bytes.splitlines splits on \n, \r\n and \r, like text-mode open()
+        lines = data.splitlines()
+    return [line.decode('utf-8', 'replace') for line in lines]
+
+
+def _append_bytes(path: Path, data: bytes):
+    """Append bytes through an O_APPEND fd, retrying short writes"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    except FileNotFoundError:
+        forget_dir(path.parent)
+        _ensure_dir(path.parent)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            if written <= 0:
+                raise OSError(f"Short write appending to {path}")
+            view = view[written:]
+    finally:
+        os.close(fd)
 
 
 def safe_append_line(path: Path, line: str):
-    """Safely append a line to a file"""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
+    """Safely append a line to a file
     
+    No FileLock is taken: the line goes out through an O_APPEND fd, so
+    each write() lands at the end of the file. Callers that must order
+    appends against other writers (e.g. log compaction) hold their own lock.
+    """
+    path = Path(path)
+    _ensure_dir(path.parent)
+
     # Ensure line ends with newline
     if not line.endswith('\n'):
         line += '\n'
-    
+
+    data = line.encode('utf-8')
+
     try:
-        with open(path, 'a') as f:
-            f.write(line)
+        _append_bytes(path, data)
     except Exception as e:
         logger.error(f"Error appending to {path}: {e}")
         raise
@@ -231,12 +624,11 @@ def safe_append_line(path: Path, line: str):
 
 def get_file_age_hours(path: Path) -> float:
     """Get file age in hours"""
-    if not path.exists():
+    st = _stat_or_none(path)
+    if st is None:
         return 0
     
-    mtime = datetime.fromtimestamp(path.stat().st_mtime)
-    age = datetime.now() - mtime
-    return age.total_seconds() / 3600
+    return (time.time_ns() - st.st_mtime_ns) / NS_PER_HOUR
 
 
 def find_latest_file(directory: Path, pattern: str) -> Optional[Path]:
@@ -244,30 +636,48 @@ def find_latest_file(directory: Path, pattern: str) -> Optional[Path]:
     if not directory.exists():
         return None
     
-    files = list(directory.glob(pattern))
-    if not files:
-        return None
+    latest = None
+    latest_mtime = None
+    for file_path, st in _iter_matching_files(directory, pattern):
+        if latest_mtime is None or st.st_mtime_ns > latest_mtime:
+            latest, latest_mtime = file_path, st.st_mtime_ns
     
-    return max(files, key=lambda p: p.stat().st_mtime)
+    return latest
 
 
 def rotate_file(path: Path, max_backups: int = 5):
     """Rotate a file by creating numbered backups"""
+    path = Path(path)
     if not path.exists():
         return
     
-    # Find next backup number
-    for i in range(max_backups):
-        backup_path = path.with_suffix(f'.{i}{path.suffix}')
-        if not backup_path.exists():
-            shutil.copy2(path, backup_path)
-            break
+    # One listing finds both the used backup numbers and the stale ones
+    backup_name = re.compile(rf'{re.escape(path.stem)}\.(\d+){re.escape(path.suffix)}')
+    used = set()
+    stale = []
+    with os.scandir(path.parent) as entries:
+        for entry in entries:
+            match = backup_name.fullmatch(entry.name)
+            if not match:
+                continue
+            index = int(match.group(1))
+            if index < max_backups:
+                used.add(index)
+            else:
+                stale.append(entry.path)
+    
+    # Find next backup number; the backup must be a copy, not a hardlink,
+    # since the original keeps being appended to in place
+    free = set(range(max_backups)) - used
+    if free:
+        shutil.copy2(path, path.with_suffix(f'.{min(free)}{path.suffix}'))
     
     # Clean up old backups
-    for i in range(max_backups, max_backups + 10):
-        backup_path = path.with_suffix(f'.{i}{path.suffix}')
-        if backup_path.exists():
-            backup_path.unlink()
+    for backup_path in stale:
+        try:
+            os.unlink(backup_path)
+        except FileNotFoundError:
+            pass
 
 
 class JSONFileStore:
@@ -275,12 +685,53 @@ class JSONFileStore:
     
     def __init__(self, path: Path):
         self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(self.path.parent)
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_key: Optional[tuple] = None
+    
+    def _load(self) -> Dict[str, Any]:
+        """Get the parsed store, re-reading only when the file has changed"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._cache = self._cache_key = None
+            return {}
+        
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key == self._cache_key:
+            return self._cache
+        
+        # Reads are not locked, so only cache a read when the file's fstat
+        # is the same before and after it; a write in between could
+        # otherwise leave a torn read cached under the finished write's key
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            self._cache = self._cache_key = None
+            return {}
+        try:
+            before = os.fstat(fd)
+            buf = os.read(fd, before.st_size) if before.st_size else b''
+            after = os.fstat(fd)
+        finally:
+            os.close(fd)
+        
+        data = _parse_json_buf(buf, self.path, {})
+        data = data if isinstance(data, dict) else {}
+        key = (after.st_mtime_ns, after.st_size, after.st_ino)
+        if key != (before.st_mtime_ns, before.st_size, before.st_ino):
+            self._cache = self._cache_key = None
+            return data
+        self._cache = data
+        self._cache_key = key
+        return data
+    
+    def _invalidate(self):
+        self._cache = self._cache_key = None
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get value by key"""
-        data = read_json_file(self.path, {})
-        return data.get(key, default)
+        return self._load().get(key, default)
     
     def set(self, key: str, value: Any):
         """Set value for key"""
@@ -291,6 +742,7 @@ class JSONFileStore:
             return data
         
         update_json_file(self.path, updater)
+        self._invalidate()
     
     def delete(self, key: str) -> bool:
         """Delete key"""
@@ -301,22 +753,56 @@ class JSONFileStore:
             return data
         
         data = update_json_file(self.path, updater)
+        self._invalidate()
         return key not in data
     
+    def set_many(self, items: Dict[str, Any]):
+        """Set several keys in one locked read-modify-write"""
+        def updater(data):
+            if not isinstance(data, dict):
+                data = {}
+            data.update(items)
+            return data
+        
+        update_json_file(self.path, updater)
+        self._invalidate()
+    
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete several keys in one locked read-modify-write
+        
+        Returns:
+            Number of keys that were present and removed
+        """
+        removed = 0
+        
+        def updater(data):
+            nonlocal removed
+            if not isinstance(data, dict):
+                return data
+            for key in keys:
+                if key in data:
+                    del data[key]
+                    removed += 1
+            return data
+        
+        update_json_file(self.path, updater)
+        self._invalidate()
+        return removed
+    
     def exists(self, key: str) -> bool:
         """Check if key exists"""
-        data = read_json_file(self.path, {})
-        return key in data
+        return key in self._load()
     
     def keys(self) -> List[str]:
         """Get all keys"""
-        data = read_json_file(self.path, {})
-        return list(data.keys()) if isinstance(data, dict) else []
+        return list(self._load().keys())
     
     def clear(self):
         """Clear all data"""
-        write_json_file(self.path, {})
+        with FileLock(self.path):
+            write_json_file(self.path, {})
+        self._invalidate()
     
     def get_all(self) -> Dict[str, Any]:
         """Get all key-value pairs"""
-        return read_json_file(self.path, {})
\ No newline at end of file
+        return dict(self._load())
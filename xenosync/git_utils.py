@@ -7,6 +7,7 @@ It wraps git commands in Python functions with proper error handling and return
 type consistency. Used primarily for managing project repositories.
 
 Key Classes:
+    - GitBatchClient: Persistent `git cat-file` reader for one repository
     - WorktreeInfo: Git worktree information
     - CommitInfo: Git commit details
     - ConflictInfo: Merge conflict information
@@ -19,6 +20,7 @@ Key Functions:
     - commit_changes(): Commit with message
     - merge_branch(): Merge branches
     - get_status(): Get repository status
+    - iter_branch_commits(): Stream commits from a branch
 
 Dependencies:
     - subprocess: Command execution
@@ -34,13 +36,18 @@ Created: 2024-08-14
 Modified: 2024-08-14
 """
 
+import atexit
+import os
+import re
 import subprocess
 import json
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Callable, Iterator
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +89,7 @@ class GitCommandError(Exception):
 
 
 def run_git_command(args: List[str], cwd: Optional[Path] = None, 
-                   check: bool = True) -> Tuple[str, str, int]:
+                   check: bool = True, input: Optional[str] = None) -> Tuple[str, str, int]:
     """
     Run a git command safely with error handling
     
@@ -90,6 +97,7 @@ def run_git_command(args: List[str], cwd: Optional[Path] = None,
         args: Git command arguments (e.g., ['status', '--porcelain'])
         cwd: Working directory for the command
         check: Whether to raise exception on non-zero exit
+        input: Text to feed the command on stdin (e.g. for --stdin modes)
         
     Returns:
         Tuple of (stdout, stderr, returncode)
@@ -104,7 +112,8 @@ def run_git_command(args: List[str], cwd: Optional[Path] = None,
             cwd=cwd,
             capture_output=True,
             text=True,
-            check=check
+            check=check,
+            input=input
         )
         return result.stdout, result.stderr, result.returncode
         
@@ -119,6 +128,132 @@ def run_git_command(args: List[str], cwd: Optional[Path] = None,
         return e.stdout, e.stderr, e.returncode
 
 
+class GitBatchClient:
+    """Long-running `git cat-file` processes serving one repository
+    
+    Each lookup is a line written to an already running git process rather
+    than a new fork/exec. Processes start on first use and are restarted if
+    they exit. Share instances through get_batch_client().
+    """
+    
+    def __init__(self, cwd: Optional[Path] = None):
+        self.cwd = cwd
+        self._procs: Dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+    
+    def resolve(self, ref: str) -> Optional[str]:
+        """
+        Resolve a ref or revision expression to an object hash
+        
+        Args:
+            ref: Anything `git rev-parse` accepts (e.g. 'HEAD', 'main~2')
+            
+        Returns:
+            Object hash, or None if it does not resolve
+        """
+        with self._lock:
+            fields, _ = self._query('--batch-check', ref)
+        if fields[-1] in (b'missing', b'ambiguous'):
+            return None
+        return fields[0].decode()
+    
+    def read_object(self, ref: str) -> Optional[bytes]:
+        """
+        Read the raw contents of an object
+        
+        Args:
+            ref: Object name (e.g. a hash or 'HEAD:README.md')
+            
+        Returns:
+            Object contents, or None if it does not resolve
+        """
+        with self._lock:
+            fields, proc = self._query('--batch', ref)
+            if fields[-1] in (b'missing', b'ambiguous'):
+                return None
+            # Contents are followed by a newline
+            return proc.stdout.read(int(fields[2]) + 1)[:-1]
+    
+    def close(self):
+        """Stop the git processes"""
+        with self._lock:
+            for mode in list(self._procs):
+                self._stop(mode)
+    
+    def _query(self, mode: str, ref: str) -> Tuple[List[bytes], subprocess.Popen]:
+        """Send one object name to the `cat-file <mode>` process and read its header"""
+        if '\n' in ref:
+            raise ValueError(f"Invalid object name: {ref!r}")
+        
+        proc = self._procs.get(mode)
+        if proc is None or proc.poll() is not None:
+            proc = self._procs[mode] = subprocess.Popen(
+                ['git', 'cat-file', mode],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        
+        try:
+            proc.stdin.write(ref.encode() + b'\n')
+            proc.stdin.flush()
+            header = proc.stdout.readline()
+        except (BrokenPipeError, OSError):
+            header = b''
+        
+        if not header:
+            self._stop(mode)
+            raise GitCommandError(f"git cat-file {mode} failed in {self.cwd or 'current dir'}")
+        return header.split(), proc
+    
+    def _stop(self, mode: str):
+        proc = self._procs.pop(mode, None)
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+
+_batch_clients: Dict[Path, GitBatchClient] = {}
+_batch_clients_lock = threading.Lock()
+
+
+def get_batch_client(cwd: Optional[Path] = None) -> GitBatchClient:
+    """
+    Get the shared GitBatchClient for a directory
+    
+    Args:
+        cwd: Repository directory (current directory if None)
+        
+    Returns:
+        GitBatchClient, closed automatically at interpreter exit
+    """
+    key = Path(cwd or os.getcwd()).resolve()
+    with _batch_clients_lock:
+        client = _batch_clients.get(key)
+        if client is None:
+            client = _batch_clients[key] = GitBatchClient(key)
+        return client
+
+
+def close_batch_clients():
+    """Stop every shared GitBatchClient"""
+    with _batch_clients_lock:
+        clients = list(_batch_clients.values())
+        _batch_clients.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_batch_clients)
+
+
 def create_worktree(path: Path, branch: str, base_branch: str = 'main',
                    create_branch: bool = True) -> WorktreeInfo:
     """
@@ -149,15 +284,25 @@ def create_worktree(path: Path, branch: str, base_branch: str = 'main',
     if returncode != 0:
         raise GitCommandError(f"Failed to create worktree at {path}: {stderr}")
     
+    clear_git_cache()
     logger.info(f"Created worktree at {path} on branch {branch}")
     
-    # Get worktree info
-    worktrees = list_worktrees()
-    for wt in worktrees:
-        if wt.path == path:
-            return wt
-    
-    # Fallback if not found in list
+    # Branch refs are shared by all worktrees, so the repo's running cat-file
+    # process can report the new worktree's commit without listing worktrees
+    try:
+        client = get_batch_client()
+        commit = client.resolve(f'refs/heads/{branch}')
+        if commit:
+            return WorktreeInfo(path=path, branch=branch, commit=commit)
+        
+        # Not a branch: the worktree is a detached checkout of a commit or tag
+        commit = client.resolve(f'{branch}^{{commit}}')
+        if commit:
+            return WorktreeInfo(path=path, branch='', commit=commit, is_detached=True)
+    except GitCommandError as e:
+        logger.debug(f"Could not resolve {branch} for new worktree: {e}")
+    
+    # Fallback if it could not be resolved
     return WorktreeInfo(path=path, branch=branch, commit='HEAD')
 
 
@@ -189,52 +334,49 @@ def remove_worktree(path: Path, force: bool = False) -> bool:
         else:
             raise GitCommandError(f"Failed to force remove worktree {path}: {stderr}")
     
+    clear_git_cache()
     logger.info(f"Removed worktree at {path}")
     return True
 
 
-def list_worktrees() -> List[WorktreeInfo]:
+_WORKTREE_FIELD_RE = re.compile(r'^(\S+)(?: (.*))?$', re.MULTILINE)
+
+
+def list_worktrees(cwd: Optional[Path] = None) -> List[WorktreeInfo]:
     """
     List all git worktrees in the repository
     
+    Args:
+        cwd: Working directory
+        
     Returns:
         List of WorktreeInfo objects
     """
-    stdout, stderr, returncode = run_git_command(['worktree', 'list', '--porcelain'])
+    stdout, stderr, returncode = run_git_command(['worktree', 'list', '--porcelain'], cwd=cwd)
     
     if returncode != 0:
         raise GitCommandError(f"Failed to list worktrees: {stderr}")
     
+    # One record per worktree, separated by blank lines; each line is a
+    # key with an optional value ('bare', 'detached', 'locked' may be bare)
     worktrees = []
-    current_wt = {}
-    
-    for line in stdout.strip().split('\n'):
-        if not line:
-            if current_wt:
-                worktrees.append(WorktreeInfo(
-                    path=Path(current_wt.get('worktree', '')),
-                    branch=current_wt.get('branch', '').replace('refs/heads/', ''),
-                    commit=current_wt.get('HEAD', ''),
-                    is_bare=current_wt.get('bare') == 'true',
-                    is_detached=current_wt.get('detached') == 'true',
-                    is_locked=bool(current_wt.get('locked')),
-                    lock_reason=current_wt.get('locked')
-                ))
-                current_wt = {}
-        else:
-            key, _, value = line.partition(' ')
-            current_wt[key] = value
-    
-    # Add last worktree if exists
-    if current_wt:
+    for record in stdout.split('\n\n'):
+        fields = dict(_WORKTREE_FIELD_RE.findall(record))
+        if 'worktree' not in fields:
+            continue
+        
+        branch = fields.get('branch', '')
+        if branch.startswith('refs/heads/'):
+            branch = branch[len('refs/heads/'):]
+        
         worktrees.append(WorktreeInfo(
-            path=Path(current_wt.get('worktree', '')),
-            branch=current_wt.get('branch', '').replace('refs/heads/', ''),
-            commit=current_wt.get('HEAD', ''),
-            is_bare=current_wt.get('bare') == 'true',
-            is_detached=current_wt.get('detached') == 'true',
-            is_locked=bool(current_wt.get('locked')),
-            lock_reason=current_wt.get('locked')
+            path=Path(fields['worktree']),
+            branch=branch,
+            commit=fields.get('HEAD', ''),
+            is_bare='bare' in fields,
+            is_detached='detached' in fields,
+            is_locked='locked' in fields,
+            lock_reason=fields.get('locked') or None
         ))
     
     return worktrees
@@ -247,25 +389,66 @@ def prune_worktrees() -> int:
     Returns:
         Number of pruned worktrees
     """
-    # First get count of current worktrees
-    before = len(list_worktrees())
-    
     stdout, stderr, returncode = run_git_command(['worktree', 'prune', '-v'])
     
     if returncode != 0:
         logger.warning(f"Failed to prune worktrees: {stderr}")
         return 0
     
-    # Count how many were pruned
-    after = len(list_worktrees())
-    pruned = before - after
+    # -v reports each pruned entry on stderr as "Removing worktrees/<name>: <why>";
+    # match on the untranslated path rather than the (localized) verb
+    pruned = sum(1 for line in stderr.splitlines() if ' worktrees/' in line)
     
     if pruned > 0:
+        clear_git_cache()
         logger.info(f"Pruned {pruned} stale worktrees")
     
     return pruned
 
 
+def _read_head_branch(cwd: Optional[Path] = None) -> Optional[str]:
+    """Current branch read from .git/HEAD, without running git
+    
+    Returns 'HEAD' when detached (as `rev-parse --abbrev-ref` does) and None
+    when cwd is not the top of a plain repo (e.g. a linked worktree), so
+    callers can fall back to get_current_branch().
+    """
+    try:
+        head = (Path(cwd or '.') / '.git' / 'HEAD').read_text().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if head.startswith('ref: refs/heads/'):
+        return head[len('ref: refs/heads/'):]
+    return 'HEAD' if head else None
+
+
+def read_head_sha(repo_path: Path) -> Optional[str]:
+    """Resolve HEAD of a (non-worktree) repo from .git files, without running git
+    
+    Returns None whenever the layout is not the plain one this handles, so
+    callers can fall back to asking git.
+    """
+    git_dir = repo_path / '.git'
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+        if not head.startswith('ref: '):
+            return head or None
+        ref = head[5:]
+        
+        try:
+            return (git_dir / ref).read_text().strip() or None
+        except FileNotFoundError:
+            pass
+        
+        # Ref has been packed
+        for line in (git_dir / 'packed-refs').read_text().splitlines():
+            if line.endswith(' ' + ref):
+                return line.split(' ', 1)[0]
+    except (OSError, UnicodeDecodeError):
+        pass
+    return None
+
+
 def get_current_branch(cwd: Optional[Path] = None) -> str:
     """
     Get the current branch name
@@ -302,6 +485,28 @@ def get_branch_commits(branch: str, limit: int = 10,
     Returns:
         List of CommitInfo objects
     """
+    return list(iter_branch_commits(branch, limit, since_commit, cwd))
+
+
+def iter_branch_commits(branch: str, limit: Optional[int] = 10,
+                        since_commit: Optional[str] = None,
+                        cwd: Optional[Path] = None) -> Iterator[CommitInfo]:
+    """
+    Stream recent commits from a branch, newest first
+    
+    Commits are parsed as git writes them, so memory stays flat for long
+    logs and callers that stop early don't wait for (or pay for) the rest;
+    git is stopped when the iterator is closed.
+    
+    Args:
+        branch: Branch name
+        limit: Maximum number of commits to yield (None for no limit)
+        since_commit: Only get commits after this commit hash
+        cwd: Working directory
+        
+    Yields:
+        CommitInfo objects
+    """
     # Get commit logs with file changes
     if since_commit:
         # Get commits since baseline: since_commit..branch
@@ -309,64 +514,62 @@ def get_branch_commits(branch: str, limit: int = 10,
     else:
         commit_range = branch
     
-    args = [
-        'log', commit_range,
-        f'--max-count={limit}',
-        '--pretty=format:%H|%an|%ai|%s',
-        '--name-only'
-    ]
+    args = ['log', commit_range, '--pretty=format:%H|%an|%at|%s', '--name-only']
+    if limit is not None:
+        args.insert(2, f'--max-count={limit}')
     
-    stdout, stderr, returncode = run_git_command(args, cwd=cwd, check=False)
+    logger.debug(f"Streaming git command: git {' '.join(args)} in {cwd or 'current dir'}")
     
-    if returncode != 0:
-        if 'unknown revision' in stderr:
-            logger.warning(f"Branch {branch} does not exist")
-            return []
-        raise GitCommandError(f"Failed to get branch commits: {stderr}")
-    
-    commits = []
-    current_commit = None
-    files = []
-    
-    for line in stdout.strip().split('\n'):
-        if '|' in line:
-            # Save previous commit if exists
-            if current_commit:
-                current_commit.files_changed = files
-                commits.append(current_commit)
-                files = []
-            
-            # Parse new commit
-            parts = line.split('|')
-            if len(parts) >= 4:
-                # Parse git date format: "2025-08-14 10:13:16 -0400"
-                # Convert to ISO format: "2025-08-14T10:13:16-04:00"
-                date_str = parts[2]
-                # Replace first space with T and fix timezone format
-                if ' ' in date_str:
-                    date_part, tz_part = date_str.rsplit(' ', 1)
-                    if len(tz_part) == 5 and (tz_part[0] == '+' or tz_part[0] == '-'):
-                        # Add colon to timezone: -0400 -> -04:00
-                        tz_part = tz_part[:3] + ':' + tz_part[3:]
-                    date_str = date_part + tz_part
-                
-                current_commit = CommitInfo(
-                    hash=parts[0],
-                    author=parts[1],
-                    date=datetime.fromisoformat(date_str.replace(' ', 'T')),
-                    message=parts[3],
-                    files_changed=[]
-                )
-        elif line and current_commit:
-            # This is a file change
-            files.append(line)
-    
-    # Add last commit
-    if current_commit:
-        current_commit.files_changed = files
-        commits.append(current_commit)
+    proc = subprocess.Popen(
+        ['git'] + args,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
     
-    return commits
+    try:
+        current_commit = None
+        
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            if '|' in line:
+                # Previous commit is complete
+                if current_commit:
+                    yield current_commit
+                    current_commit = None
+                
+                # Parse new commit
+                parts = line.split('|')
+                if len(parts) >= 4:
+                    current_commit = CommitInfo(
+                        hash=parts[0],
+                        author=parts[1],
+                        # %at is the author time as a Unix timestamp
+                        date=datetime.fromtimestamp(int(parts[2]), tz=timezone.utc),
+                        message=parts[3],
+                        files_changed=[]
+                    )
+            elif line and current_commit:
+                # This is a file change
+                current_commit.files_changed.append(line)
+        
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            if 'unknown revision' in stderr:
+                logger.warning(f"Branch {branch} does not exist")
+                return
+            raise GitCommandError(f"Failed to get branch commits: {stderr}")
+        
+        # Add last commit
+        if current_commit:
+            yield current_commit
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
 
 
 def check_merge_conflicts(source_branch: str, target_branch: str,
@@ -374,6 +577,10 @@ def check_merge_conflicts(source_branch: str, target_branch: str,
     """
     Check if merging source into target would cause conflicts
     
+    Uses `git merge-tree --write-tree`, which performs the merge in memory
+    without touching HEAD, the index or the working tree, so checks are safe
+    to run while agents work in the repo.
+    
     Args:
         source_branch: Branch to merge from
         target_branch: Branch to merge into
@@ -382,6 +589,54 @@ def check_merge_conflicts(source_branch: str, target_branch: str,
     Returns:
         List of ConflictInfo objects (empty if no conflicts)
     """
+    stdout, stderr, returncode = run_git_command(
+        ['merge-tree', '--write-tree', '--name-only', '-z', target_branch, source_branch],
+        cwd=cwd,
+        check=False
+    )
+    
+    if returncode == 0:
+        return []
+    if returncode == 129:
+        # git older than 2.38 has no --write-tree; do a trial merge instead
+        return _check_merge_conflicts_by_checkout(source_branch, target_branch, cwd)
+    if returncode != 1 or not stdout:
+        raise GitCommandError(f"Failed to check merge of {source_branch} into {target_branch}: {stderr}")
+    
+    # <tree>\0<path>\0...<path>\0\0 then messages, each
+    # <path count>\0<path>\0...<type>\0<message>\0
+    files_part, _, messages_part = stdout.partition('\0\0')
+    conflicted = files_part.split('\0')[1:]
+    
+    conflict_types = {}
+    fields = messages_part.split('\0')
+    i = 0
+    while i < len(fields) and fields[i].isdigit():
+        count = int(fields[i])
+        paths = fields[i + 1:i + 1 + count]
+        kind = fields[i + 1 + count] if i + 1 + count < len(fields) else ''
+        i += count + 3
+        
+        if not kind.startswith('CONFLICT'):
+            continue
+        if 'delete' in kind:
+            conflict_type = 'delete'
+        elif 'rename' in kind:
+            conflict_type = 'rename'
+        else:
+            conflict_type = 'content'
+        for path in paths:
+            conflict_types.setdefault(path, conflict_type)
+    
+    return [
+        ConflictInfo(file_path=path, conflict_type=conflict_types.get(path, 'content'))
+        for path in conflicted if path
+    ]
+
+
+def _check_merge_conflicts_by_checkout(source_branch: str, target_branch: str,
+                                       cwd: Optional[Path] = None) -> List[ConflictInfo]:
+    """Trial-merge fallback for check_merge_conflicts (checks out target)"""
     # Save current branch
     original_branch = get_current_branch(cwd)
     
@@ -497,9 +752,13 @@ def merge_branch(source_branch: str, target_branch: Optional[str] = None,
     Returns:
         Tuple of (success, list of conflicted files)
     """
-    # Checkout target branch if specified
+    # Checkout target branch if specified and not already on it
     if target_branch:
-        run_git_command(['checkout', target_branch], cwd=cwd)
+        current = _read_head_branch(cwd) or get_current_branch(cwd)
+        if current == target_branch:
+            logger.debug(f"Already on {target_branch}, skipping checkout")
+        else:
+            run_git_command(['checkout', target_branch], cwd=cwd)
     
     # Build merge command
     args = ['merge', source_branch, f'--strategy={strategy}']
@@ -557,52 +816,159 @@ def commit_changes(message: str, files: Optional[List[str]] = None,
             return ""
         raise GitCommandError(f"Failed to commit: {stderr}")
     
-    # Get commit hash
-    stdout, stderr, returncode = run_git_command(['rev-parse', 'HEAD'], cwd=cwd)
-    commit_hash = stdout.strip()
+    # Get commit hash: straight from .git files when possible, else from
+    # the repo's persistent cat-file process
+    commit_hash = read_head_sha(Path(cwd or '.')) or ''
+    if not commit_hash:
+        try:
+            commit_hash = get_batch_client(cwd).resolve('HEAD') or ''
+        except GitCommandError:
+            commit_hash = ''
+    if not commit_hash:
+        stdout, stderr, returncode = run_git_command(['rev-parse', 'HEAD'], cwd=cwd)
+        commit_hash = stdout.strip()
     
     logger.info(f"Created commit {commit_hash[:8]}: {message}")
     return commit_hash
 
 
-def get_status(cwd: Optional[Path] = None) -> Dict[str, List[str]]:
+def get_status(cwd: Optional[Path] = None, include_untracked: bool = True) -> Dict[str, List[str]]:
     """
     Get git status
     
     Args:
         cwd: Working directory
+        include_untracked: List untracked files; pass False to skip the
+            working-tree scan for them
         
     Returns:
-        Dictionary with keys: 'staged', 'modified', 'untracked'
+        Dictionary with keys: 'staged', 'modified', 'untracked', 'unmerged'
     """
+    # v2 -z: fixed fields and unquoted NUL-terminated paths; no optional
+    # index refresh lock and no upstream ahead/behind count
     stdout, stderr, returncode = run_git_command(
-        ['status', '--porcelain'],
+        ['--no-optional-locks', 'status', '--porcelain=v2', '-z', '--no-ahead-behind',
+         f"--untracked-files={'normal' if include_untracked else 'no'}"],
         cwd=cwd
     )
     
     status = {
         'staged': [],
         'modified': [],
-        'untracked': []
+        'untracked': [],
+        'unmerged': []
     }
     
-    for line in stdout.strip().split('\n'):
-        if not line:
-            continue
-        
-        status_code = line[:2]
-        file_path = line[3:]
+    entries = iter(stdout.split('\0'))
+    for entry in entries:
+        kind = entry[:1]
         
-        if status_code[0] in 'ADMR':
-            status['staged'].append(file_path)
-        if status_code[1] == 'M':
-            status['modified'].append(file_path)
-        elif status_code == '??':
-            status['untracked'].append(file_path)
+        if kind == '1' or kind == '2':
+            # 1 XY sub mH mI mW hH hI path
+            # 2 XY sub mH mI mW hH hI Xscore path, then original path
+            fields = entry.split(' ', 8 if kind == '1' else 9)
+            file_path = fields[-1]
+            if kind == '2':
+                next(entries, None)
+            
+            if fields[1][0] != '.':
+                status['staged'].append(file_path)
+            if fields[1][1] == 'M':
+                status['modified'].append(file_path)
+        elif kind == 'u':
+            status['unmerged'].append(entry.split(' ', 10)[-1])
+        elif kind == '?':
+            status['untracked'].append(entry[2:])
     
     return status
 
 
+# (kind, directory) -> (time.monotonic() when loaded, value)
+_read_cache: Dict[Tuple[str, Path], Tuple[float, Any]] = {}
+_read_cache_locks: Dict[Tuple[str, Path], threading.Lock] = {}
+_read_cache_guard = threading.Lock()
+
+
+def _cached_read(kind: str, cwd: Optional[Path], ttl: float,
+                 loader: Callable[[Path], Any]) -> Any:
+    """Stale-while-revalidate read of loader(directory)
+    
+    Fresh (< ttl) values are returned as is. Values up to 2 * ttl old are
+    returned immediately while one background thread reloads them. Anything
+    older, or missing, is loaded synchronously, once for concurrent callers.
+    """
+    key = (kind, Path(cwd or os.getcwd()).resolve())
+    with _read_cache_guard:
+        lock = _read_cache_locks.setdefault(key, threading.Lock())
+    
+    entry = _read_cache.get(key)
+    if entry:
+        age = time.monotonic() - entry[0]
+        if age < ttl:
+            return entry[1]
+        if age < 2 * ttl:
+            # Holding the lock marks the refresh as running; skip if it is
+            if lock.acquire(blocking=False):
+                threading.Thread(target=_refresh_cached_read, args=(key, lock, loader),
+                                 daemon=True).start()
+            return entry[1]
+    
+    with lock:
+        entry = _read_cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        value = loader(key[1])
+        _read_cache[key] = (time.monotonic(), value)
+        return value
+
+
+def _refresh_cached_read(key: Tuple[str, Path], lock: threading.Lock,
+                         loader: Callable[[Path], Any]):
+    """Background reload for _cached_read; releases the caller's lock"""
+    try:
+        _read_cache[key] = (time.monotonic(), loader(key[1]))
+    except Exception as e:
+        logger.debug(f"Background refresh of {key[0]} in {key[1]} failed: {e}")
+    finally:
+        lock.release()
+
+
+def clear_git_cache():
+    """Drop every cached get_status_cached/list_worktrees_cached result"""
+    _read_cache.clear()
+
+
+def get_status_cached(cwd: Optional[Path] = None, ttl: float = 2.0) -> Dict[str, List[str]]:
+    """
+    get_status() for polling callers, served from a short-lived cache
+    
+    Args:
+        cwd: Working directory
+        ttl: Seconds a result is fresh; it may be served up to 2 * ttl old
+            while a refresh runs in the background
+        
+    Returns:
+        Same as get_status()
+    """
+    status = _cached_read('status', cwd, ttl, get_status)
+    return {key: list(paths) for key, paths in status.items()}
+
+
+def list_worktrees_cached(cwd: Optional[Path] = None, ttl: float = 2.0) -> List[WorktreeInfo]:
+    """
+    list_worktrees() for polling callers, served from a short-lived cache
+    
+    Args:
+        cwd: Working directory
+        ttl: Seconds a result is fresh; it may be served up to 2 * ttl old
+            while a refresh runs in the background
+        
+    Returns:
+        Same as list_worktrees()
+    """
+    return list(_cached_read('worktrees', cwd, ttl, list_worktrees))
+
+
 def enable_rerere(global_config: bool = True) -> bool:
     """
     Enable git rerere (Reuse Recorded Resolution) for automatic conflict resolution
@@ -639,36 +1005,51 @@ def cleanup_worktree_branches(session_id: str, keep_merged: bool = False) -> int
     Returns:
         Number of branches deleted
     """
-    # List all branches
-    stdout, stderr, returncode = run_git_command(['branch', '-a'])
-    
+    session_prefix = f"agent-"
+
+    # Let git filter to local session branches (flat and nested names)
+    stdout, stderr, returncode = run_git_command([
+        'for-each-ref', '--format=%(refname:short)',
+        f'refs/heads/{session_prefix}*', f'refs/heads/{session_prefix}*/**'
+    ])
+
     if returncode != 0:
         logger.error(f"Failed to list branches: {stderr}")
         return 0
+
+    candidates = [branch for branch in stdout.split() if session_id[:8] in branch]
     
-    deleted = 0
-    session_prefix = f"agent-"
+    if not candidates:
+        return 0
     
-    for line in stdout.strip().split('\n'):
-        branch = line.strip().replace('* ', '')
-        
-        # Skip if not a session branch
-        if not branch.startswith(session_prefix) or session_id[:8] not in branch:
+    # One merged listing for all candidates instead of one per branch
+    merged = set()
+    if not keep_merged:
+        stdout, stderr, returncode = run_git_command(
+            ['branch', '--merged', 'main', '--format=%(refname:short)'],
+            check=False
+        )
+        merged = set(stdout.split())
+    
+    # Delete merged branches with -d and the rest with -D, one git call each
+    deleted = 0
+    for flag, branches in (('-d', [b for b in candidates if b in merged]),
+                           ('-D', [b for b in candidates if b not in merged])):
+        if not branches:
+            continue
+        stdout, stderr, returncode = run_git_command(['branch', flag, *branches], check=False)
+        if returncode == 0:
+            deleted += len(branches)
             continue
         
-        # Check if merged
-        if not keep_merged:
-            stdout, stderr, returncode = run_git_command(
-                ['branch', '--merged', 'main'],
-                check=False
-            )
-            is_merged = branch in stdout
-        else:
-            is_merged = False
-        
-        # Delete branch
-        if delete_branch(branch, force=not is_merged):
-            deleted += 1
+        # git deletes what it can and fails on the rest; see what is left
+        logger.warning(f"Some branches could not be deleted: {stderr.strip()}")
+        stdout, _, _ = run_git_command(
+            ['for-each-ref', '--format=%(refname:short)',
+             *(f'refs/heads/{branch}' for branch in branches)],
+            check=False
+        )
+        deleted += len(branches) - len(stdout.split())
     
     if deleted > 0:
         logger.info(f"Deleted {deleted} branches for session {session_id}")
@@ -33,22 +33,128 @@ Created: 2024-08-14
 Modified: 2024-08-14
 """
 
-import json
 import logging
+import os
+import re
 import shutil
+import subprocess
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Any, Tuple, Callable
+from dataclasses import dataclass
 from enum import Enum
 
 from .config import Config
 from .exceptions import CoordinationError
-from .git_utils import run_git_command, GitCommandError
+from .git_utils import run_git_command, read_head_sha, GitCommandError
+from .file_utils import FileLock, json_dumps
 
 logger = logging.getLogger(__name__)
 
 
+def _list_project_files(project_path: Path) -> List[str]:
+    """List a project's files (relative paths), skipping anything git-related
+    
+    One os.walk pass; .git directories are pruned rather than descended into
+    and filtered afterwards, so their object stores are never listed.
+    """
+    files = []
+    for dirpath, dirnames, filenames in os.walk(project_path):
+        dirnames[:] = [d for d in dirnames if '.git' not in d]
+        rel_dir = os.path.relpath(dirpath, project_path)
+        for name in filenames:
+            if '.git' in name:
+                continue
+            files.append(name if rel_dir == '.' else os.path.join(rel_dir, name))
+    return files
+
+
+def _init_repo(repo_path: Path, user_name: str, user_email: str):
+    """git init a repo and give it a local commit identity
+    
+    For a fresh repo the identity is appended to .git/config directly rather
+    than through two more `git config` processes; the values are generated
+    and need no quoting. Re-initialized repos go through `git config` so an
+    existing identity is replaced, not duplicated.
+    """
+    fresh = not (repo_path / '.git').exists()
+    run_git_command(['init'], cwd=repo_path)
+    if fresh:
+        with open(repo_path / '.git' / 'config', 'a') as f:
+            f.write(f"[user]\n\tname = {user_name}\n\temail = {user_email}\n")
+    else:
+        run_git_command(['config', 'user.name', user_name], cwd=repo_path)
+        run_git_command(['config', 'user.email', user_email], cwd=repo_path)
+
+
+# Files merged with the `weave` semantic (function-level) merge driver
+SEMANTIC_MERGE_PATTERNS = ('*.py', '*.ts', '*.js')
+
+# `weave --version` output of the merge tool ("weave 0.3.1"); other tools
+# named weave (e.g. the Weave Net CLI, "weave script 2.8.1") do not match
+_WEAVE_VERSION_RE = re.compile(r'^weave v?\d+\.\d+')
+
+
+@lru_cache(maxsize=1)
+def _semantic_merge_available() -> bool:
+    """Whether the `weave` on PATH is the semantic merge tool"""
+    weave = shutil.which('weave')
+    if weave is None:
+        return False
+    try:
+        result = subprocess.run([weave, '--version'], capture_output=True,
+                                text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    version = result.stdout.strip()
+    if result.returncode != 0 or not _WEAVE_VERSION_RE.match(version):
+        logger.warning(f"Ignoring {weave}: not the weave merge tool ({version or result.stderr.strip()!r})")
+        return False
+    return True
+
+
+def _configure_semantic_merge(repo_path: Path) -> List[str]:
+    """Route SEMANTIC_MERGE_PATTERNS through `weave` in a repo, if it is installed
+    
+    Uses .git/info/attributes so nothing is committed into the project.
+    
+    Returns:
+        The patterns now merged semantically (empty when weave is missing)
+    """
+    if not _semantic_merge_available():
+        return []
+    
+    attributes = repo_path / '.git' / 'info' / 'attributes'
+    attributes.parent.mkdir(exist_ok=True)
+    existing = attributes.read_text().splitlines() if attributes.exists() else []
+    missing = [f"{pattern} merge=weave" for pattern in SEMANTIC_MERGE_PATTERNS
+               if f"{pattern} merge=weave" not in existing]
+    if missing:
+        with open(attributes, 'a') as f:
+            f.write(''.join(f"{line}\n" for line in missing))
+    
+    run_git_command(['config', 'merge.weave.name', 'weave semantic merge'], cwd=repo_path)
+    run_git_command(['config', 'merge.weave.driver', 'weave merge %O %A %B %P'], cwd=repo_path)
+    return list(SEMANTIC_MERGE_PATTERNS)
+
+
+def _remove_counting(entry: os.DirEntry) -> int:
+    """Remove a directory entry (recursively), returning how many paths it held"""
+    if not entry.is_dir(follow_symlinks=False):
+        os.unlink(entry.path)
+        return 1
+    
+    count = 1
+    for _, dirnames, filenames in os.walk(entry.path):
+        count += len(dirnames) + len(filenames)
+    shutil.rmtree(entry.path)
+    return count
+
+
 class ProjectStatus(Enum):
     """Status of agent project"""
     INITIALIZED = "initialized"
@@ -78,14 +184,23 @@ class AgentProject:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        data = asdict(self)
-        data['status'] = self.status.value
-        data['workspace_path'] = str(self.workspace_path)
-        data['project_path'] = str(self.project_path)
-        data['created_at'] = self.created_at.isoformat()
-        if self.completed_at:
-            data['completed_at'] = self.completed_at.isoformat()
-        return data
+        # Built directly: asdict() would deep-copy every field via reflection
+        return {
+            'agent_id': self.agent_id,
+            'agent_uid': self.agent_uid,
+            'session_id': self.session_id,
+            'workspace_path': str(self.workspace_path),
+            'project_path': str(self.project_path),
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'files_created': list(self.files_created),
+            'commits': self.commits
+        }
+    
+    def to_json(self) -> str:
+        """Serialize to a JSON string (orjson when installed)"""
+        return json_dumps(self.to_dict())
 
 
 class ProjectWorkspaceCoordinator:
@@ -97,10 +212,25 @@ class ProjectWorkspaceCoordinator:
         self.current_session_id: Optional[str] = None
         self.agent_projects: Dict[int, AgentProject] = {}
         
+        # agent_id -> (HEAD sha, commit count) from the last progress poll
+        self._commit_counts: Dict[int, Tuple[str, int]] = {}
+        
+        # agent_id -> progress scan in flight, shared by concurrent callers
+        self._inflight_progress: Dict[int, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # agent_id -> lock serializing git writes to that agent's repo
+        self._project_locks: Dict[int, threading.Lock] = {}
+        
+        # Called with the agent_id whenever a project is marked complete
+        self._completion_listeners: List[Callable[[int], None]] = []
+        
         # Project configuration
         self.project_name = config.get('project_name', 'project')
         self.use_git = config.get('use_git_in_projects', True)
         self.merge_strategy = config.get('project_merge_strategy', 'combine')
+        self.merge_lock_timeout = config.get('project_merge_lock_timeout', 300)
+        self.semantic_merge = config.get('project_semantic_merge', False)
         
         logger.info("Initialized ProjectWorkspaceCoordinator")
     
@@ -137,9 +267,7 @@ class ProjectWorkspaceCoordinator:
         # Initialize git in final project if using git
         if self.use_git:
             try:
-                run_git_command(['init'], cwd=final_project_dir)
-                run_git_command(['config', 'user.name', 'Xenosync'], cwd=final_project_dir)
-                run_git_command(['config', 'user.email', 'xenosync@local'], cwd=final_project_dir)
+                _init_repo(final_project_dir, 'Xenosync', 'xenosync@local')
                 
                 # Create initial commit
                 readme_path = final_project_dir / 'README.md'
@@ -181,10 +309,7 @@ class ProjectWorkspaceCoordinator:
         if self.use_git:
             try:
                 # Initialize git repo
-                run_git_command(['init'], cwd=project_path)
-                run_git_command(['config', 'user.name', f'Agent-{agent_id}'], cwd=project_path)
-                run_git_command(['config', 'user.email', f'agent-{agent_id}@xenosync.local'], 
-                              cwd=project_path)
+                _init_repo(project_path, f'Agent-{agent_id}', f'agent-{agent_id}@xenosync.local')
                 
                 # Create initial commit
                 readme_path = project_path / 'README.md'
@@ -207,6 +332,7 @@ class ProjectWorkspaceCoordinator:
             created_at=datetime.now()
         )
         self.agent_projects[agent_id] = agent_project
+        self._commit_counts.pop(agent_id, None)
         
         logger.info(f"Created project workspace for agent {agent_id} at {project_path}")
         
@@ -222,30 +348,64 @@ class ProjectWorkspaceCoordinator:
         Returns:
             Progress information
         """
+        # Concurrent pollers of the same agent share one scan
+        with self._inflight_lock:
+            future = self._inflight_progress.get(agent_id)
+            owner = future is None
+            if owner:
+                future = self._inflight_progress[agent_id] = Future()
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            progress = self._track_agent_progress(agent_id)
+            future.set_result(progress)
+            return progress
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight_progress.pop(agent_id, None)
+    
+    def track_all_agents_progress(self, agent_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Track progress of several agents' projects in one call
+        
+        Each agent has its own repo, so the scans run concurrently rather than
+        one after another.
+        
+        Args:
+            agent_ids: Agents to track (default: all agents with projects)
+            
+        Returns:
+            Progress information keyed by agent ID
+        """
+        if agent_ids is None:
+            agent_ids = list(self.agent_projects)
+        if len(agent_ids) <= 1:
+            return {agent_id: self.track_agent_progress(agent_id) for agent_id in agent_ids}
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(agent_ids))) as pool:
+            return dict(zip(agent_ids, pool.map(self.track_agent_progress, agent_ids)))
+    
+    def _track_agent_progress(self, agent_id: int) -> Dict[str, Any]:
+        """Scan an agent's project and update its tracked state"""
         if agent_id not in self.agent_projects:
             return {'status': 'no_project'}
         
         project = self.agent_projects[agent_id]
         
         # Count files in project
-        files_created = []
-        if project.project_path.exists():
-            for file_path in project.project_path.rglob('*'):
-                if file_path.is_file() and '.git' not in str(file_path):
-                    relative_path = file_path.relative_to(project.project_path)
-                    files_created.append(str(relative_path))
+        files_created = _list_project_files(project.project_path)
         
         project.files_created = files_created
         
         # Get git commit count if using git
         commit_count = 0
         if self.use_git and (project.project_path / '.git').exists():
-            try:
-                result = run_git_command(['rev-list', '--count', 'HEAD'], 
-                                       cwd=project.project_path)
-                commit_count = int(result[0].strip()) if result else 0
-            except:
-                pass
+            commit_count = self._count_commits(agent_id, project.project_path)
         
         project.commits = commit_count
         
@@ -263,6 +423,24 @@ class ProjectWorkspaceCoordinator:
             'project_path': str(project.project_path)
         }
     
+    def _count_commits(self, agent_id: int, project_path: Path) -> int:
+        """Count commits on HEAD, reusing the last count while HEAD is unchanged"""
+        head = read_head_sha(project_path)
+        cached = self._commit_counts.get(agent_id)
+        if head and cached and cached[0] == head:
+            return cached[1]
+        
+        try:
+            result = run_git_command(['rev-list', '--count', 'HEAD'], 
+                                   cwd=project_path)
+            commit_count = int(result[0].strip()) if result else 0
+        except:
+            return 0
+        
+        if head:
+            self._commit_counts[agent_id] = (head, commit_count)
+        return commit_count
+    
     def complete_agent_project(self, agent_id: int) -> bool:
         """
         Mark an agent's project as complete
@@ -279,28 +457,46 @@ class ProjectWorkspaceCoordinator:
         project = self.agent_projects[agent_id]
         
         # Create final commit if using git
+        # (one caller at a time per repo, so two completions of the same agent
+        # don't race on its index.lock)
         if self.use_git and (project.project_path / '.git').exists():
-            try:
-                # Check for uncommitted changes
-                status_result = run_git_command(['status', '--porcelain'], 
-                                              cwd=project.project_path)
-                if status_result and status_result[0].strip():
-                    # Stage all changes
-                    run_git_command(['add', '-A'], cwd=project.project_path)
-                    # Commit
-                    run_git_command(['commit', '-m', f'Final commit for agent {agent_id}'], 
-                                  cwd=project.project_path)
-                    logger.info(f"Created final commit for agent {agent_id}")
-            except Exception as e:
-                logger.warning(f"Failed to create final commit: {e}")
+            with self._project_locks.setdefault(agent_id, threading.Lock()):
+                try:
+                    # Check for uncommitted changes
+                    status_result = run_git_command(['status', '--porcelain'], 
+                                                  cwd=project.project_path)
+                    if status_result and status_result[0].strip():
+                        # Stage all changes
+                        run_git_command(['add', '-A'], cwd=project.project_path)
+                        # Commit
+                        run_git_command(['commit', '-m', f'Final commit for agent {agent_id}'], 
+                                      cwd=project.project_path)
+                        logger.info(f"Created final commit for agent {agent_id}")
+                except Exception as e:
+                    logger.warning(f"Failed to create final commit: {e}")
         
         # Mark as completed
         project.status = ProjectStatus.COMPLETED
         project.completed_at = datetime.now()
         
         logger.info(f"Agent {agent_id} project marked as completed")
+        
+        for listener in list(self._completion_listeners):
+            try:
+                listener(agent_id)
+            except Exception as e:
+                logger.warning(f"Completion listener failed for agent {agent_id}: {e}")
         return True
     
+    def add_completion_listener(self, listener: Callable[[int], None]):
+        """Register a callback invoked with the agent_id when a project completes"""
+        self._completion_listeners.append(listener)
+    
+    def remove_completion_listener(self, listener: Callable[[int], None]):
+        """Unregister a callback added with add_completion_listener"""
+        if listener in self._completion_listeners:
+            self._completion_listeners.remove(listener)
+    
     def merge_agent_projects(self) -> Dict[str, Any]:
         """
         Merge all completed agent projects into final-project
@@ -327,10 +523,16 @@ class ProjectWorkspaceCoordinator:
         
         logger.info(f"Merging {len(completed_projects)} agent projects")
         
-        if self.merge_strategy == 'git' and self.use_git:
-            results = self._merge_with_git(completed_projects, final_project_dir)
-        else:
-            results = self._merge_with_files(completed_projects, final_project_dir)
+        # Serialize writers of final-project (its index, refs and config)
+        # across processes; the lock file sits beside it, not inside the repo
+        try:
+            with FileLock(final_project_dir, timeout=self.merge_lock_timeout):
+                if self.merge_strategy == 'git' and self.use_git:
+                    results = self._merge_with_git(completed_projects, final_project_dir)
+                else:
+                    results = self._merge_with_files(completed_projects, final_project_dir)
+        except TimeoutError as e:
+            raise CoordinationError(f"Another merge into {final_project_dir} is in progress") from e
         
         # Mark merged projects
         for project in completed_projects:
@@ -352,37 +554,47 @@ class ProjectWorkspaceCoordinator:
         # Track which files came from which agent
         file_sources = {}
         
+        # What final_dir already holds, listed once up front, so each copied
+        # file costs no exists() stat and each directory one mkdir at most
+        existing_files = set(_list_project_files(final_dir))
+        ensured_dirs = set()
+        
+        def copy_into_final(file_path: Path, relative_path: str, dest_path: Path):
+            parent = os.path.dirname(relative_path)
+            if parent not in ensured_dirs:
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                ensured_dirs.add(parent)
+            shutil.copy2(file_path, dest_path)
+            existing_files.add(relative_path)
+        
         for project in projects:
             try:
                 files_copied = 0
                 
-                for file_path in project.project_path.rglob('*'):
-                    if file_path.is_file() and '.git' not in str(file_path):
-                        relative_path = file_path.relative_to(project.project_path)
-                        dest_path = final_dir / relative_path
+                for relative_path in _list_project_files(project.project_path):
+                    file_path = project.project_path / relative_path
+                    dest_path = final_dir / relative_path
+                    
+                    # Check for conflicts
+                    if relative_path in existing_files:
+                        if str(relative_path) not in file_sources:
+                            file_sources[str(relative_path)] = []
+                        file_sources[str(relative_path)].append(project.agent_id)
                         
-                        # Check for conflicts
-                        if dest_path.exists():
-                            if str(relative_path) not in file_sources:
-                                file_sources[str(relative_path)] = []
-                            file_sources[str(relative_path)].append(project.agent_id)
-                            
-                            # Handle conflict based on strategy
-                            if self.config.get('conflict_resolution', 'skip') == 'overwrite':
-                                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                                shutil.copy2(file_path, dest_path)
-                                files_copied += 1
-                            else:
-                                results['conflicts'].append({
-                                    'file': str(relative_path),
-                                    'agents': file_sources[str(relative_path)]
-                                })
-                        else:
-                            # No conflict, copy file
-                            dest_path.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(file_path, dest_path)
+                        # Handle conflict based on strategy
+                        if self.config.get('conflict_resolution', 'skip') == 'overwrite':
+                            copy_into_final(file_path, relative_path, dest_path)
                             files_copied += 1
-                            file_sources[str(relative_path)] = [project.agent_id]
+                        else:
+                            results['conflicts'].append({
+                                'file': str(relative_path),
+                                'agents': file_sources[str(relative_path)]
+                            })
+                    else:
+                        # No conflict, copy file
+                        copy_into_final(file_path, relative_path, dest_path)
+                        files_copied += 1
+                        file_sources[str(relative_path)] = [project.agent_id]
                 
                 results['merged_projects'].append(project.agent_id)
                 results['total_files'] += files_copied
@@ -429,70 +641,108 @@ class ProjectWorkspaceCoordinator:
             'conflicts': []
         }
         
-        # Add each project as a remote and merge
-        for i, project in enumerate(projects):
+        if self.semantic_merge:
             try:
-                remote_name = f"agent-{project.agent_id}"
-                
-                # Add project as remote
-                run_git_command(['remote', 'add', remote_name, 
-                               str(project.project_path)], cwd=final_dir)
-                
-                # Fetch from remote
-                run_git_command(['fetch', remote_name], cwd=final_dir)
-                
-                # Merge
+                patterns = _configure_semantic_merge(final_dir)
+                if patterns:
+                    logger.info(f"Semantic merge (weave) enabled for: {', '.join(patterns)}")
+                else:
+                    logger.info("Semantic merge requested but the weave merge tool is not installed")
+            except (GitCommandError, OSError) as e:
+                logger.warning(f"Failed to configure semantic merge: {e}")
+        
+        # Fetch every project's HEAD into its own ref in parallel: fetches
+        # only add objects and each updates a different ref, so they do not
+        # contend. Merges touch the index and stay sequential.
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=min(8, len(projects))) as pool:
+            futures = {
+                project.agent_id: pool.submit(self._fetch_project, project, final_dir)
+                for project in projects
+            }
+            for agent_id, future in futures.items():
                 try:
-                    run_git_command(['merge', f'{remote_name}/main', '--no-ff',
-                                   '-m', f'Merge agent {project.agent_id} project'],
-                                   cwd=final_dir)
+                    fetched[agent_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch agent {agent_id} project: {e}")
+        
+        for project in projects:
+            ref = fetched.get(project.agent_id)
+            if ref is None:
+                results['failed_projects'].append(project.agent_id)
+                continue
+            try:
+                # Merge; agent projects are separate repos, so histories are unrelated
+                stdout, stderr, returncode = run_git_command(
+                    ['merge', ref, '--no-ff', '--allow-unrelated-histories',
+                     '-m', f'Merge agent {project.agent_id} project'],
+                    cwd=final_dir, check=False)
+                if returncode == 0:
                     results['merged_projects'].append(project.agent_id)
                     logger.info(f"Successfully merged agent {project.agent_id} via git")
-                except GitCommandError as e:
-                    if 'conflict' in str(e).lower():
+                else:
+                    # git reports conflicts on stdout
+                    if 'conflict' in (stdout + stderr).lower():
                         results['conflicts'].append({
                             'agent': project.agent_id,
                             'error': 'merge conflict'
                         })
                         # Abort merge
                         run_git_command(['merge', '--abort'], cwd=final_dir)
+                    else:
+                        logger.error(f"Failed to merge agent {project.agent_id}: {stderr.strip()}")
                     results['failed_projects'].append(project.agent_id)
                 
-                # Remove remote
-                run_git_command(['remote', 'remove', remote_name], cwd=final_dir)
-                
             except Exception as e:
                 logger.error(f"Failed to merge agent {project.agent_id}: {e}")
                 results['failed_projects'].append(project.agent_id)
         
+        # Drop the temporary refs in one process
+        if fetched:
+            run_git_command(['update-ref', '--stdin'], cwd=final_dir, check=False,
+                           input=''.join(f'delete {ref}\n' for ref in fetched.values()))
+        
         # Count files in final project
         file_count = len(list(final_dir.rglob('*'))) - 1  # Exclude .git
         results['total_files'] = file_count
         
         return results
     
+    @staticmethod
+    def _fetch_project(project: AgentProject, final_dir: Path) -> str:
+        """Fetch an agent project's HEAD into a private ref of final_dir"""
+        ref = f'refs/xenosync/agent-{project.agent_id}'
+        # The fetch runs inside final_dir, so a relative workspace path
+        # must be made absolute first
+        run_git_command(['fetch', '--no-tags', '--no-write-fetch-head',
+                        str(project.project_path.resolve()), f'+HEAD:{ref}'],
+                        cwd=final_dir)
+        return ref
+    
     def get_session_status(self) -> Dict[str, Any]:
         """Get comprehensive status of the current session"""
         if not self.current_session_id:
             return {'status': 'no_session'}
         
-        # Collect project statistics
+        # Collect project statistics in one pass over the projects
         total_projects = len(self.agent_projects)
-        completed_projects = sum(1 for p in self.agent_projects.values() 
-                               if p.status == ProjectStatus.COMPLETED)
-        merged_projects = sum(1 for p in self.agent_projects.values() 
-                            if p.status == ProjectStatus.MERGED)
-        total_files = sum(len(p.files_created) for p in self.agent_projects.values())
+        status_counts = Counter()
+        total_files = 0
         
         agents_status = []
         for agent_id, project in self.agent_projects.items():
+            files_created = len(project.files_created)
+            status_counts[project.status] += 1
+            total_files += files_created
             agents_status.append({
                 'agent_id': agent_id,
                 'status': project.status.value,
-                'files_created': len(project.files_created),
+                'files_created': files_created,
                 'commits': project.commits,
                 'project_path': str(project.project_path)
             })
+        completed_projects = status_counts[ProjectStatus.COMPLETED]
+        merged_projects = status_counts[ProjectStatus.MERGED]
         
         return {
             'session_id': self.current_session_id,
@@ -522,11 +772,14 @@ class ProjectWorkspaceCoordinator:
         }
         
         if not keep_projects and self.workspace_dir and self.workspace_dir.exists():
-            # Count files before deletion
-            stats['files_removed'] = len(list(self.workspace_dir.rglob('*')))
             stats['projects_removed'] = len(self.agent_projects)
             
-            # Remove entire workspace
+            # Agent workspaces and final-project are independent trees, so
+            # count and remove them in parallel, then drop the workspace itself
+            entries = list(os.scandir(self.workspace_dir))
+            if entries:
+                with ThreadPoolExecutor(max_workers=min(8, len(entries))) as pool:
+                    stats['files_removed'] = sum(pool.map(_remove_counting, entries))
             shutil.rmtree(self.workspace_dir)
             logger.info(f"Removed workspace directory: {self.workspace_dir}")
         else:
@@ -534,5 +787,6 @@ class ProjectWorkspaceCoordinator:
         
         # Clear tracking
         self.agent_projects.clear()
+        self._commit_counts.clear()
         
         return stats
\ No newline at end of file
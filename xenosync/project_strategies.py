@@ -34,8 +34,9 @@ Modified: 2024-08-14
 """
 
 import asyncio
+import heapq
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 
@@ -46,6 +47,8 @@ from .exceptions import StrategyError
 
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 60
+
 
 class ProjectExecutionStrategy(ABC):
     """Base class for project workspace execution strategies"""
@@ -63,6 +66,15 @@ class ProjectExecutionStrategy(ABC):
     def get_description(self) -> str:
         """Get strategy description"""
         pass
+    
+    def _has_work(self, prompt: SyncPrompt) -> bool:
+        """Fail fast without agents; return False when there are no tasks to run"""
+        if not self.agent_manager.agents:
+            raise StrategyError("No agents available")
+        if not prompt.steps:
+            logger.info("No tasks; nothing to do")
+            return False
+        return True
 
 
 class ProjectParallelStrategy(ProjectExecutionStrategy):
@@ -79,9 +91,9 @@ class ProjectParallelStrategy(ProjectExecutionStrategy):
     async def execute(self, prompt: SyncPrompt, session_id: str) -> bool:
         """Execute tasks in parallel using project workspaces"""
         try:
-            logger.info("=" * 60)
+            logger.info(_BANNER)
             logger.info("PROJECT-BASED PARALLEL EXECUTION")
-            logger.info("=" * 60)
+            logger.info(_BANNER)
             
             # Get agents
             agents = self.agent_manager.agents
@@ -89,16 +101,19 @@ class ProjectParallelStrategy(ProjectExecutionStrategy):
                 raise StrategyError("No agents available")
             
             num_agents = len(agents)
-            logger.info(f"Distributing {len(prompt.steps)} tasks among {num_agents} agents")
+            num_tasks = len(prompt.steps)
+            logger.info("Distributing %d tasks among %d agents", num_tasks, num_agents)
             
             # Pre-divide tasks among agents
             assignments = self._divide_tasks(prompt.steps, num_agents)
             
-            # Log task distribution
-            for agent_id, agent_tasks in assignments.items():
-                agent = self.agent_manager.get_agent_by_id(agent_id)
-                if agent:
-                    logger.info(f"Agent {agent_id} assigned {len(agent_tasks)} tasks in project: {agent.worktree_path}")
+            # Log task distribution (skip the agent lookups when INFO is off)
+            if logger.isEnabledFor(logging.INFO):
+                for agent_id, agent_tasks in assignments.items():
+                    agent = self.agent_manager.get_agent_by_id(agent_id)
+                    if agent:
+                        logger.info("Agent %d assigned %d tasks in project: %s",
+                                    agent_id, len(agent_tasks), agent.worktree_path)
             
             # Record agent start times for minimum duration tracking
             current_time = datetime.now()
@@ -156,13 +171,38 @@ class ProjectParallelStrategy(ProjectExecutionStrategy):
             raise StrategyError(f"Parallel execution failed: {e}")
     
     def _divide_tasks(self, steps: List[SyncStep], num_agents: int) -> Dict[int, List[SyncStep]]:
-        """Divide tasks among agents"""
+        """Divide tasks among agents
+        
+        When steps carry estimated_time, longest tasks are handed out first to
+        whichever agent has the least estimated work (LPT), so one agent isn't
+        left with all the long steps. Steps without an estimate count as the
+        default 5 minutes. Each agent's tasks keep their original step order.
+        
+        Only agents that receive at least one task get an entry, so with fewer
+        steps than agents the surplus agents are left out entirely.
+        """
+        num_agents = min(num_agents, len(steps))
         assignments = {i: [] for i in range(num_agents)}
         
-        # Round-robin distribution for better balance
+        if not any(step.estimated_time for step in steps):
+            # Round-robin distribution for better balance
+            for idx, step in enumerate(steps):
+                agent_id = idx % num_agents
+                assignments[agent_id].append(step)
+            return assignments
+        
+        # (load, agent_id) heap: ties go to the lowest agent id, which makes
+        # equal-cost steps fall out round-robin
+        loads = [(0, agent_id) for agent_id in range(num_agents)]
+        by_cost = sorted(range(len(steps)), key=lambda idx: -(steps[idx].estimated_time or 5))
+        chosen: Dict[int, int] = {}
+        for idx in by_cost:
+            load, agent_id = heapq.heappop(loads)
+            chosen[idx] = agent_id
+            heapq.heappush(loads, (load + (steps[idx].estimated_time or 5), agent_id))
+        
         for idx, step in enumerate(steps):
-            agent_id = idx % num_agents
-            assignments[agent_id].append(step)
+            assignments[chosen[idx]].append(step)
         
         return assignments
     
@@ -170,6 +210,7 @@ class ProjectParallelStrategy(ProjectExecutionStrategy):
                                    assignments: Dict[int, List[SyncStep]]):
         """Send initial prompts to all agents with their task assignments"""
         
+        sends = []
         for agent_id, tasks in assignments.items():
             if not tasks:
                 continue
@@ -179,10 +220,9 @@ class ProjectParallelStrategy(ProjectExecutionStrategy):
                 continue
             
             # Build personalized prompt for this agent
-            task_list = "\n".join([
-                f"{idx + 1}. {task.content}"
-                for idx, task in enumerate(tasks)
-            ])
+            task_list = "\n".join(
+                f"{idx}. {task.content}" for idx, task in enumerate(tasks, 1)
+            )
             
             message = f"""
 {prompt.initial_prompt}
@@ -211,22 +251,77 @@ INSTRUCTIONS:
 Begin with task 1: {tasks[0].content}
 """
             
-            # Send message to agent
-            await self.agent_manager.send_to_agent(agent_id, message)
-            
-            # Mark tasks as started
-            for task in tasks:
-                agent = self.agent_manager.get_agent_by_id(agent_id)
-                if agent:
+            sends.append((agent, tasks, message))
+        
+        # Deliver all prompts concurrently; one failed agent doesn't stop the rest
+        results = await asyncio.gather(
+            *(self.agent_manager.send_to_agent(agent.id, message) for agent, _, message in sends),
+            return_exceptions=True
+        )
+        
+        # Mark tasks as started only for agents that actually got their prompt
+        for (agent, tasks, _), result in zip(sends, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send initial prompt to agent {agent.id}: {result}")
+            elif result:
+                for task in tasks:
                     agent.start_task(task.number)
     
     async def _monitor_execution(self, session_id: str, 
                                 assignments: Dict[int, List[SyncStep]]) -> bool:
         """Monitor execution progress with enhanced completion detection and minimum duration"""
         
-        check_interval = 30  # Check every 30 seconds
-        max_duration = 3600  # Maximum 1 hour
-        elapsed = 0
+        # Agents with nothing assigned have nothing to track or wait for
+        assignments = {agent_id: tasks for agent_id, tasks in assignments.items() if tasks}
+        
+        check_interval = 30  # Check at least every 30 seconds
+        min_interval = min(check_interval, self.agent_manager.config.get('project_monitor_min_interval', 5))
+        
+        # Time budget scales with the busiest agent's task count: at least
+        # 1 hour (timing out skips the merge) and one task's budget past the
+        # minimum work duration, at most 24 hours
+        per_task_budget = self.agent_manager.config.get('project_task_budget_seconds', 600)
+        minimum_duration = self.agent_manager.config.get('minimum_work_duration_minutes', 10) * 60
+        largest_bucket = max((len(tasks) for tasks in assignments.values()), default=0)
+        max_duration = min(24 * 3600, max(3600, minimum_duration + per_task_budget,
+                                           largest_bucket * per_task_budget))
+        logger.info(f"Execution time budget: {max_duration / 60:.0f} minutes "
+                    f"({largest_bucket} tasks max per agent)")
+        
+        # Wake early whenever a project is completed elsewhere (e.g. by the
+        # agent manager's own monitor) instead of waiting out the full
+        # interval. Completions the loop makes itself are skipped: listeners
+        # run synchronously inside complete_agent_project, so the loop marks
+        # its agents in own_completions before calling it
+        loop = asyncio.get_running_loop()
+        completed = asyncio.Event()
+        own_completions: Set[int] = set()
+        
+        def on_complete(agent_id: int):
+            if agent_id not in own_completions:
+                loop.call_soon_threadsafe(completed.set)
+        
+        self.coordinator.add_completion_listener(on_complete)
+        try:
+            return await self._monitor_loop(assignments, completed, own_completions,
+                                             min_interval, check_interval, max_duration)
+        finally:
+            self.coordinator.remove_completion_listener(on_complete)
+    
+    async def _monitor_loop(self, assignments: Dict[int, List[SyncStep]],
+                            completed: asyncio.Event, own_completions: Set[int],
+                            min_interval: float, check_interval: float,
+                            max_duration: float) -> bool:
+        """Check agents each time a project completes or the poll interval passes
+        
+        The interval starts at min_interval, doubles up to check_interval while
+        no agent's (status, files, commits) changes, and drops back to
+        min_interval as soon as one does.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_duration
+        interval = min_interval
+        prev_state: Dict[int, tuple] = {}
         
         # Get configuration settings
         minimum_duration_minutes = self.agent_manager.config.get('minimum_work_duration_minutes', 10)
@@ -235,22 +330,41 @@ Begin with task 1: {tasks[0].content}
         logger.info(f"Monitoring with minimum work duration: {minimum_duration_minutes} minutes")
         logger.info(f"Enhanced completion detection: {'enabled' if require_confidence else 'disabled'}")
         
-        while elapsed < max_duration:
-            await asyncio.sleep(check_interval)
-            elapsed += check_interval
+        while loop.time() < deadline:
+            try:
+                await asyncio.wait_for(completed.wait(),
+                                       min(interval, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            completed.clear()
             
             # Check progress of each agent
             all_complete = True
             status_summary = []
             agents_ready_for_completion = {}  # Track which agents meet completion criteria
             
+            # Get progress for every agent from project coordinator at once
+            all_progress = self.coordinator.track_all_agents_progress(list(assignments))
+            
+            # Back off while nothing changes, poll quickly again once it does
+            state = {
+                agent_id: (p['status'], p.get('files_created', 0), p.get('commits', 0))
+                for agent_id, p in all_progress.items()
+            }
+            interval = min_interval if state != prev_state else min(interval * 2, check_interval)
+            
+            # Only agents whose state moved since last tick get a status line
+            changed = {agent_id for agent_id, st in state.items() if prev_state.get(agent_id) != st}
+            prev_state = state
+            
             for agent_id, tasks in assignments.items():
                 agent = self.agent_manager.get_agent_by_id(agent_id)
                 if not agent:
                     continue
                 
-                # Get progress from project coordinator
-                progress = self.coordinator.track_agent_progress(agent_id)
+                progress = all_progress[agent_id]
+                status, files, commits = state[agent_id]
+                report = agent_id in changed
                 
                 # Calculate work duration for this agent
                 start_time = self.agent_start_times.get(agent_id)
@@ -261,22 +375,21 @@ Begin with task 1: {tasks[0].content}
                 # Check minimum duration requirement
                 meets_minimum_duration = work_duration_minutes >= minimum_duration_minutes
                 
-                if progress['status'] == 'no_project':
+                if status == 'no_project':
                     # No project yet
-                    status_summary.append(f"Agent {agent_id}: No project ({work_duration_minutes:.1f}m)")
+                    if report:
+                        status_summary.append(f"Agent {agent_id}: No project ({work_duration_minutes:.1f}m)")
                     all_complete = False
-                elif progress['status'] in ['initialized', 'in_progress']:
-                    files = progress.get('files_created', 0)
-                    commits = progress.get('commits', 0)
-                    
-                    status_parts = [f"Agent {agent_id}: Working"]
-                    if files > 0:
-                        status_parts.append(f"{files} files")
-                    if commits > 1:  # More than initial commit
-                        status_parts.append(f"{commits} commits")
-                    status_parts.append(f"{work_duration_minutes:.1f}m")
-                    
-                    status_summary.append(" - ".join(status_parts))
+                elif status in ('initialized', 'in_progress'):
+                    if report:
+                        status_parts = [f"Agent {agent_id}: Working"]
+                        if files > 0:
+                            status_parts.append(f"{files} files")
+                        if commits > 1:  # More than initial commit
+                            status_parts.append(f"{commits} commits")
+                        status_parts.append(f"{work_duration_minutes:.1f}m")
+                        
+                        status_summary.append(" - ".join(status_parts))
                     
                     # Check if this agent is ready for completion consideration
                     if meets_minimum_duration:
@@ -329,19 +442,20 @@ Begin with task 1: {tasks[0].content}
                         logger.debug(f"Agent {agent_id} needs {remaining_minutes:.1f} more minutes before completion consideration")
                         all_complete = False
                         
-                elif progress['status'] == 'completed':
-                    files = progress.get('files_created', 0)
-                    status_summary.append(f"Agent {agent_id}: Completed ({files} files, {work_duration_minutes:.1f}m)")
+                elif status == 'completed':
+                    if report:
+                        status_summary.append(f"Agent {agent_id}: Completed ({files} files, {work_duration_minutes:.1f}m)")
                     # Already marked as completed
                 else:
-                    status_summary.append(f"Agent {agent_id}: {progress['status']} ({work_duration_minutes:.1f}m)")
+                    if report:
+                        status_summary.append(f"Agent {agent_id}: {status} ({work_duration_minutes:.1f}m)")
                     all_complete = False
             
             # Log status with each agent on its own line
             if status_summary:
                 logger.info("Status Update:")
-                for status in status_summary:
-                    logger.info(f"  {status}")
+                for line in status_summary:
+                    logger.info(f"  {line}")
             
             # Check if we should mark agents as complete
             if agents_ready_for_completion:
@@ -350,6 +464,7 @@ Begin with task 1: {tasks[0].content}
                 # Mark ready agents as complete
                 for agent_id, completion_info in agents_ready_for_completion.items():
                     try:
+                        own_completions.add(agent_id)
                         self.coordinator.complete_agent_project(agent_id)
                         logger.info(f"Marked agent {agent_id} project as complete "
                                   f"(reason: {completion_info['reason']}, "
@@ -358,13 +473,12 @@ Begin with task 1: {tasks[0].content}
                     except Exception as e:
                         logger.error(f"Failed to complete agent {agent_id} project: {e}")
             
-            # Check if all agents are now complete
-            all_actually_complete = True
-            for agent_id in assignments.keys():
-                progress = self.coordinator.track_agent_progress(agent_id)
-                if progress['status'] != 'completed':
-                    all_actually_complete = False
-                    break
+            # Check if all agents are now complete (status only, no rescan)
+            projects = self.coordinator.agent_projects
+            all_actually_complete = all(
+                agent_id in projects and projects[agent_id].status.value == 'completed'
+                for agent_id in assignments
+            )
             
             if all_actually_complete:
                 logger.info("All agents have completed their projects")
@@ -428,9 +542,9 @@ Begin with task 1: {tasks[0].content}
     async def _run_finalization_phase(self, session_id: str, prompt: SyncPrompt) -> bool:
         """Run post-merge optimization and documentation with dedicated finalization agent"""
         try:
-            logger.info("=" * 60)
+            logger.info(_BANNER)
             logger.info("🔧 POST-MERGE FINALIZATION PHASE")
-            logger.info("=" * 60)
+            logger.info(_BANNER)
             
             # Get finalization settings from config
             finalization_timeout = self.agent_manager.config.get('finalization_timeout', 600)
@@ -611,37 +725,63 @@ Start by opening the project and testing it immediately to see what's broken.
 class ProjectCollaborativeStrategy(ProjectExecutionStrategy):
     """Collaborative execution with shared project components"""
     
+    def __init__(self, agent_manager: AgentManager, coordinator: ProjectWorkspaceCoordinator):
+        super().__init__(agent_manager, coordinator)
+        # Parallel strategy this delegates to, created on first use
+        self._fallback: Optional[ProjectParallelStrategy] = None
+    
     def get_description(self) -> str:
         return "Collaborative execution - agents coordinate on shared project components"
     
     async def execute(self, prompt: SyncPrompt, session_id: str) -> bool:
         """Execute tasks collaboratively in project workspaces"""
         
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         logger.info("PROJECT COLLABORATIVE EXECUTION")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
+        
+        if not self._has_work(prompt):
+            return True
         
         # This strategy would implement agents working on different parts
         # of the same project with more coordination
         
         # For now, fallback to parallel
         logger.info("Collaborative strategy not yet implemented, using parallel")
-        parallel = ProjectParallelStrategy(self.agent_manager, self.coordinator)
-        return await parallel.execute(prompt, session_id)
+        if self._fallback is None:
+            self._fallback = ProjectParallelStrategy(self.agent_manager, self.coordinator)
+        return await self._fallback.execute(prompt, session_id)
 
 
 class ProjectAdaptiveStrategy(ProjectExecutionStrategy):
     """Adaptive strategy that adjusts based on project requirements"""
     
+    def __init__(self, agent_manager: AgentManager, coordinator: ProjectWorkspaceCoordinator):
+        super().__init__(agent_manager, coordinator)
+        # Delegate instances, created on first use and reused across runs;
+        # which one runs is decided again for every prompt
+        self._strategies: Dict[str, ProjectExecutionStrategy] = {}
+    
     def get_description(self) -> str:
         return "Adaptive execution - automatically chooses strategy based on project analysis"
     
+    def _get_strategy(self, name: str) -> ProjectExecutionStrategy:
+        """Get the cached delegate strategy, creating it on first use"""
+        strategy = self._strategies.get(name)
+        if strategy is None:
+            strategy_class = ProjectParallelStrategy if name == 'parallel' else ProjectCollaborativeStrategy
+            strategy = self._strategies[name] = strategy_class(self.agent_manager, self.coordinator)
+        return strategy
+    
     async def execute(self, prompt: SyncPrompt, session_id: str) -> bool:
         """Adaptively choose strategy based on project requirements"""
         
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         logger.info("PROJECT ADAPTIVE EXECUTION")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
+        
+        if not self._has_work(prompt):
+            return True
         
         # Analyze tasks to determine best strategy
         num_tasks = len(prompt.steps)
@@ -650,9 +790,9 @@ class ProjectAdaptiveStrategy(ProjectExecutionStrategy):
         # Simple heuristic: use parallel for many independent tasks
         if num_tasks >= num_agents * 2:
             logger.info(f"Using parallel strategy for {num_tasks} tasks")
-            strategy = ProjectParallelStrategy(self.agent_manager, self.coordinator)
+            strategy = self._get_strategy('parallel')
         else:
             logger.info(f"Using collaborative strategy for {num_tasks} tasks")
-            strategy = ProjectCollaborativeStrategy(self.agent_manager, self.coordinator)
+            strategy = self._get_strategy('collaborative')
         
         return await strategy.execute(prompt, session_id)
\ No newline at end of file